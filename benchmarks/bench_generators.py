@@ -0,0 +1,281 @@
+# bench_generators.py
+
+# Reproducible micro-benchmarks for the hot paths of magicguess.generators
+#
+#   python benchmarks/bench_generators.py                       run and print a table
+#   python benchmarks/bench_generators.py --save-baseline b.json
+#   python benchmarks/bench_generators.py --baseline b.json     fail on regressions
+#
+# Profiles are synthetic and seeded, so two runs on the same tree generate the
+# same candidates; only the timings differ.
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicguess.core import MasterGuess
+from magicguess import generators as g
+from magicguess.utils import clear_variant_caches
+
+FIRST_NAMES = ["Marcelo", "Sarah", "Mia", "John", "Ana", "Rui", "Luna", "Pedro", "Ines", "Tiago",
+               "Maria", "Joao", "Beatriz", "Miguel", "Sofia", "Diogo", "Carla", "Nuno", "Rita", "Hugo"]
+LAST_NAMES = ["Bregieira", "Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues"]
+PET_NAMES = ["Rex", "Bobi", "Tareco", "Kiko", "Nala", "Simba", "Max", "Pipoca", "Faisca", "Lua"]
+KEYWORDS = ["porto", "benfica1904", "sporting", "lisboa", "surf", "guitarra", "coimbra", "praia"]
+
+DEFAULT_SIZES = (1, 5, 10, 20)
+DEFAULT_MAX_BASE = 1_000
+DEFAULT_PIN_LENGTHS = (4, 5)
+DEFAULT_THRESHOLD = 0.10
+
+
+# -------------------------
+# Synthetic profiles
+# -------------------------
+def _random_date(rng):
+    return date(rng.randint(1940, 2023), rng.randint(1, 12), rng.randint(1, 28))
+
+
+def _random_name(rng, parts):
+    return " ".join([rng.choice(FIRST_NAMES)] + [rng.choice(FIRST_NAMES + LAST_NAMES) for _ in range(parts - 1)])
+
+
+def make_profile(size, leet=False, seed=1):
+    """
+    Build a synthetic MasterGuess profile with `size` relationships, children
+    and pets, a multi-part target name, `size` important dates and keywords.
+    """
+    rng = random.Random(f"{seed}-{size}")
+
+    def person(parts):
+        return {"name": _random_name(rng, parts), "birth": _random_date(rng) if rng.random() < 0.8 else None,
+                "nickname": rng.choice(FIRST_NAMES)[:3] if rng.random() < 0.5 else ""}
+
+    return MasterGuess(
+        name=_random_name(rng, 3),
+        birth=_random_date(rng),
+        relationships=[person(2) for _ in range(size)],
+        children=[person(rng.randint(1, 2)) for _ in range(size)],
+        pets=[{"name": rng.choice(PET_NAMES), "birth": _random_date(rng) if rng.random() < 0.5 else None,
+               "nickname": ""} for _ in range(size)],
+        important_dates=[_random_date(rng) for _ in range(size)],
+        keywords=[rng.choice(KEYWORDS) + (str(rng.randint(0, 99)) if rng.random() < 0.3 else "")
+                  for _ in range(size)],
+        emails=[f"user{rng.randint(1000, 999999)}@example.com"],
+        leet_enabled=leet,
+    )
+
+
+def _profile_names(profile):
+    names = [profile.name]
+    for group in (profile.relationships, profile.children, profile.pets):
+        names += [p["name"] for p in group]
+    return names
+
+
+def _profile_dates(profile):
+    dates = [profile.birth] + profile.important_dates
+    for group in (profile.relationships, profile.children, profile.pets):
+        dates += [p.get("birth") for p in group]
+    return [d for d in dates if d]
+
+
+# -------------------------
+# Benchmarked functions
+# -------------------------
+# Each case builds its inputs outside the timed region and returns a callable
+# that runs the hot function once and returns the number of items it produced.
+# The variant functions are memoized (utils.variant_cache); their cases call
+# the undecorated functions with cold caches, so they time the work rather
+# than LRU hits (synthetic profiles repeat names).
+def case_name_variants(profile, args):
+    names = _profile_names(profile)
+
+    def run():
+        clear_variant_caches()
+        return sum(len(g.name_variants.__wrapped__(n)) for n in names)
+    return run
+
+
+def case_date_variants(profile, args):
+    dates = _profile_dates(profile)
+
+    def run():
+        clear_variant_caches()
+        return sum(len(g.date_variants.__wrapped__(d)) for d in dates)
+    return run
+
+
+def case_entity_date_combos(profile, args):
+    ctx = g._build_wordlist_context(profile)
+    entities = g._collect_all_entities(ctx)
+    return lambda: sum(1 for _ in g._combine_entity_date_combos(entities, ctx["date_list"]))
+
+
+def case_final_transforms(profile, args):
+    # the full expansion of a 20-relation profile runs for hours; time a fixed prefix
+    ctx = g._build_wordlist_context(profile)
+
+    def run():
+        counters = {}
+        for _ in g._iter_final_transforms(lambda: itertools.islice(g._iter_base_words(ctx), args.max_base),
+                                          profile, counters):
+            pass
+        return counters["candidates"]
+    return run
+
+
+def case_final_pinlist(profile, args):
+    sources = g._collect_pin_sources(profile)
+    inputs = {n: g._pin_sources_for_length(sources, n) for n in args.pin_lengths}
+
+    def run():
+        return sum(len(g._build_final_pinlist(*inputs[n], g._iter_virtual_keyspace(n), n)) for n in inputs)
+    return run
+
+
+CASES = {
+    "name_variants": case_name_variants,
+    "date_variants": case_date_variants,
+    "entity_date_combos": case_entity_date_combos,
+    "final_transforms": case_final_transforms,
+    "final_pinlist": case_final_pinlist,
+}
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def measure(run, min_time, repeat):
+    """
+    Returns (items, best seconds per call, peak traced bytes). The call is
+    looped until it takes at least `min_time` and the best of `repeat` such
+    rounds is kept; peak memory comes from one separate traced call.
+    """
+    items = run()
+    loops, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return items, best, peak
+
+
+def run_benchmarks(args):
+    results = {}
+    for size, leet, case in itertools.product(args.sizes, args.leet, args.cases):
+        key = f"{case}[size={size},leet={'on' if leet else 'off'}]"
+        profile = make_profile(size, leet, args.seed)
+        # generators report progress with print(); keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = CASES[case](profile, args)
+            items, seconds, peak = measure(run, args.min_time, args.repeat)
+        results[key] = {
+            "items": items,
+            "seconds": seconds,
+            "items_per_sec": items / seconds if seconds else 0.0,
+            "peak_bytes": peak,
+        }
+        print(f"{key:<48} {items:>12,} items {seconds * 1000:>11.2f} ms "
+              f"{results[key]['items_per_sec']:>14,.0f}/s {peak / 1024 / 1024:>9.2f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print throughput/memory changes against a saved baseline.
+    Returns the keys whose throughput dropped or peak memory grew by more than `threshold`.
+    """
+    regressions = []
+    print(f"\n=== Comparison with baseline (threshold {threshold:.0%}) ===")
+    for key, res in results.items():
+        old = baseline.get(key)
+        if old is None:
+            print(f"{key:<48} (new)")
+            continue
+        if old["items"] != res["items"]:
+            print(f"{key:<48} item count changed: {old['items']:,} -> {res['items']:,}")
+        speed = res["items_per_sec"] / old["items_per_sec"] - 1 if old["items_per_sec"] else 0.0
+        memory = res["peak_bytes"] / old["peak_bytes"] - 1 if old["peak_bytes"] else 0.0
+        flag = ""
+        if speed < -threshold or memory > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<48} throughput {speed:+7.1%}  peak memory {memory:+7.1%}{flag}")
+    return regressions
+
+
+def _int_list(value):
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of magicguess.generators.")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+                        help="comma-separated relation/child/pet counts (default 1,5,10,20)")
+    parser.add_argument("--cases", type=lambda v: v.split(","), default=list(CASES),
+                        help=f"comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--leet", choices=["off", "on", "both"], default="both")
+    parser.add_argument("--max-base", type=int, default=DEFAULT_MAX_BASE,
+                        help="base words fed to final_transforms (default 1000)")
+    parser.add_argument("--pin-lengths", type=_int_list, default=list(DEFAULT_PIN_LENGTHS))
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds, the best is kept")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown/memory growth reported as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    args.leet = {"off": [False], "on": [True], "both": [False, True]}[args.leet]
+
+    print(f"Python {platform.python_version()} on {platform.machine()} ({platform.system()})\n")
+    results = run_benchmarks(args)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+        print(f"\n[+] Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
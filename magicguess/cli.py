@@ -1,10 +1,22 @@
 # cli.py
 from magicguess.core import MasterGuess
-from magicguess.utils import validate_date, validate_email
-from magicguess.generators import generate_wordlist, generate_pinlist
-from magicguess.io_handlers import save_wordlist
+from magicguess.utils import validate_date, validate_email, sanitize_word, variant_cache_stats
+from magicguess.generators import (
+    iter_wordlist, iter_base_candidates, build_hashcat_rules, iter_pinlists,
+    estimate_wordlist, estimate_pinlists, close_stream, resolve_workers
+)
+from magicguess.crack import crack_candidates
+from magicguess.exclusion import ExclusionIndex
+from magicguess.markov import load_markov_model
+from magicguess.io_handlers import (
+    save_wordlist, save_pinlist, save_rules, resolve_output, load_profiles, load_leet_map,
+    load_policy, load_scoring_model, load_hashes, stream_candidates
+)
+from magicguess.instrumentation import StageRecorder, get_recorder
 
 from datetime import date as dt
+from types import SimpleNamespace
+import os
 
 def ask_yes_no(prompt):
     """
@@ -91,8 +103,193 @@ def create_masterguess():
         emails=emails
     )
 
-def main_cli():
+# keys a batch profile's "options" object may set: its outputs, leet and the
+# run options handled by apply_run_options
+BATCH_OPTIONS = frozenset({
+    "leet", "wordlist", "pinlist", "pin_length", "pin_lengths",
+    "dedup", "fp_rate", "dedup_capacity", "dedup_partitions", "workers", "compress",
+    "hashcat_rules", "write_base_file", "shards", "shard_mode", "skip", "limit",
+    "leet_depth", "leet_budget", "leet_word_budget", "leet_map", "policy", "exclude",
+    "top", "score_model", "markov",
+})
+
+def apply_run_options(mg, options):
+    """
+    Copy run options given on the command line onto the profile.
+    Options left unset keep the profile defaults.
+    """
+    if options is None:
+        return
+    if getattr(options, "dedup", None):
+        mg.dedup_mode = options.dedup
+    if getattr(options, "fp_rate", None) is not None:
+        mg.dedup_fp_rate = options.fp_rate
+    if getattr(options, "dedup_capacity", None) is not None:
+        mg.dedup_capacity = options.dedup_capacity
+    if getattr(options, "dedup_partitions", None) is not None:
+        mg.dedup_partitions = options.dedup_partitions
+    if getattr(options, "workers", None) is not None:
+        mg.workers = options.workers
+    if getattr(options, "compress", None):
+        mg.output_compression = options.compress
+    if getattr(options, "hashcat_rules", False):
+        mg.export_mode = "rules"
+    if getattr(options, "write_base_file", False):
+        mg.write_base_file = True
+    if getattr(options, "shards", None) is not None:
+        mg.output_shards = max(1, int(options.shards))
+    if getattr(options, "shard_mode", None):
+        mg.shard_mode = options.shard_mode
+    if getattr(options, "skip", None) is not None:
+        mg.skip = max(0, int(options.skip))
+    if getattr(options, "limit", None) is not None:
+        mg.limit = max(0, int(options.limit))
+    if getattr(options, "policy", None):
+        mg.policy = load_policy(options.policy)
+    if getattr(options, "top", None) is not None:
+        mg.top = max(1, int(options.top))
+    if getattr(options, "score_model", None):
+        mg.scoring_model = load_scoring_model(options.score_model)
+    if getattr(options, "markov", None):
+        mg.markov = load_markov_model(options.markov)
+    if getattr(options, "exclude", None):
+        sources = [options.exclude] if isinstance(options.exclude, str) else options.exclude
+        mg.exclude = ExclusionIndex(sources)
+    if getattr(options, "output_stream", None) is not None:
+        mg.output_stream = options.output_stream
+    if getattr(options, "leet_depth", None) is not None:
+        mg.leet_depth = max(1, int(options.leet_depth))
+    if getattr(options, "leet_map", None):
+        mg.leet_map = load_leet_map(options.leet_map)
+    if getattr(options, "leet_word_budget", None) is not None:
+        mg.leet_word_budget = options.leet_word_budget
+    if getattr(options, "leet_budget", None) is not None:
+        mg.leet_budget = options.leet_budget
+
+def _save_output(mg, items, filename, save, stage):
+    """
+    Write one output, to its file or to the profile's output stream.
+    Returns the number of lines written.
+    """
+    try:
+        with get_recorder(mg).stage(stage) as rec:
+            if mg.output_stream is not None:
+                rec["items_out"] = stream_candidates(items, mg.output_stream)
+            else:
+                rec["items_out"] = save(items, filename, mg.output_compression,
+                                        mg.output_shards, mg.shard_mode)
+    except BaseException as e:
+        # finish the generator now, so its resume hint is printed in order
+        close_stream(items, e)
+        raise
+    return rec["items_out"]
+
+def generate_outputs(mg, wordlist_file=None, pinlist_file=None, pin_lengths=(4,)):
+    """
+    Generate and save the requested outputs for a profile.
+    Shared by the interactive CLI and batch mode. `pinlist_file` may contain
+    a "{length}" placeholder; it is added automatically for several lengths.
+    With mg.output_stream set, every output is piped to that stream instead
+    (wordlist first, then the PIN lists) and filenames only name rule files.
+    """
+    mg.generate_wordlist = bool(wordlist_file)
+    mg.generate_pinlist = bool(pinlist_file)
+    if mg.output_stream is not None and mg.output_shards > 1:
+        print("[!] --shards applies to output files; ignored while streaming.")
+
+    if mg.generate_wordlist:
+        filename = wordlist_file
+        if mg.export_mode == "rules":
+            # base words only; hashcat applies numbers/specials/leet on the fly
+            if mg.skip or mg.limit is not None:
+                print("[!] --skip/--limit index the expanded wordlist; ignored with --hashcat-rules.")
+            if mg.top:
+                print("[!] --top ranks expanded candidates; ignored with --hashcat-rules.")
+            if mg.markov is not None:
+                print("[!] --markov ranks expanded candidates; the wordlist is not ranked with --hashcat-rules.")
+            rule_file = os.path.splitext(filename)[0] + ".rule"
+            filename, _ = resolve_output(filename, mg.output_compression)
+            mg.wordlist_count = _save_output(mg, iter_base_candidates(mg), filename, save_wordlist,
+                                             "output.wordlist")
+            save_rules(build_hashcat_rules(mg.leet_enabled, mg.leet_depth, mg.leet_map), rule_file)
+            source = "-" if mg.output_stream is not None else filename
+            print(f"[+] Use with: hashcat -a 0 <hashes> {source} -r {rule_file}")
+        else:
+            if mg.top and (mg.skip or mg.limit is not None):
+                print("[!] --skip/--limit index the unranked wordlist; ignored with --top.")
+            if mg.top and resolve_workers(mg) != 1:
+                print("[!] --top ranks candidates in a single process; --workers ignored.")
+            # stream candidates straight to disk instead of building the full list first
+            mg.wordlist_count = _save_output(mg, iter_wordlist(mg), filename, save_wordlist,
+                                             "output.wordlist")
+
+    if mg.generate_pinlist:
+        # the profile is scanned once and fanned out to every requested length
+        mg.pinlist_count = 0
+        several = len(set(pin_lengths)) > 1
+        for length, pins in iter_pinlists(mg, pin_lengths):
+            mg.pinlist_count += _save_output(mg, pins, pinlist_filename(pinlist_file, length, several),
+                                             save_pinlist, f"output.pinlist[{length}]")
+
+def crack_outputs(mg, hash_type, targets, found, wordlist=True, pin_lengths=()):
+    """
+    Check the profile's wordlist and PIN list candidates against the target
+    hashes in-process instead of writing them. Cracked hashes are added to
+    `found` ({hash: candidate}); generation stops once every target is found.
+    """
+    workers = resolve_workers(mg)
+    if wordlist and len(found) < len(targets):
+        # the hashing pool takes the worker budget, so the candidates are
+        # expanded in this process instead of a second pool of the same size
+        expand_workers, mg.workers = mg.workers, 1
+        try:
+            with get_recorder(mg).stage("crack.wordlist") as rec:
+                rec["items_in"] = crack_candidates(iter_wordlist(mg), hash_type, targets, workers, found)
+        finally:
+            mg.workers = expand_workers
+    if pin_lengths and len(found) < len(targets):
+        for length, pins in iter_pinlists(mg, pin_lengths):
+            with get_recorder(mg).stage(f"crack.pinlist[{length}]") as rec:
+                rec["items_in"] = crack_candidates(pins, hash_type, targets, workers, found)
+            if len(found) == len(targets):
+                break
+
+def print_crack_summary(targets, found):
+    print(f"\n[+] Cracked {len(found)}/{len(targets)} hashes")
+    for digest, word in found.items():
+        print(f"    {digest}:{word}")
+
+def pinlist_filename(template, length, several=False):
+    """
+    Fill the "{length}" placeholder of a PIN list filename. Without a
+    placeholder, "_<length>" is inserted before the extension when several
+    lengths share one template.
+    """
+    if "{length}" in template:
+        return template.replace("{length}", str(length))
+    if not several:
+        return template
+    root, ext = os.path.splitext(template)
+    return f"{root}_{length}{ext}"
+
+def parse_pin_lengths(raw, default=4):
+    """
+    Parse a comma-separated list of PIN lengths (e.g. "4,6,8").
+    Returns [default] for an empty answer and raises ValueError on invalid input.
+    """
+    if not raw.strip():
+        return [default]
+    lengths = [int(x) for x in raw.split(",") if x.strip()]
+    if not lengths or any(n < 1 for n in lengths):
+        raise ValueError(raw)
+    return lengths
+
+def main_cli(options=None):
     mg = create_masterguess()
+    apply_run_options(mg, options)
+    if getattr(options, "report", None):
+        mg.recorder = StageRecorder()
+        mg.recorder.profile = mg.name
 
     # Choose generation
     print("Do you want to create a wordlist, a PIN list, or both?")
@@ -106,33 +303,58 @@ def main_cli():
         return
 
     if choice == "pinlist" or choice == "both":
-        pinlist_length = input("\n[!] What is the desired PIN length? (Press Enter for default 4-digit PINs. e.g. 6) ")
-        if not pinlist_length:
-            pinlist_length = 4
-        else:
-            try:
-                pinlist_length = int(pinlist_length)
-            except ValueError:
-                print("Invalid PIN length. Using default 4-digit PINs.")
-                pinlist_length = 4
+        raw = input("\n[!] What is the desired PIN length? (Press Enter for default 4-digit PINs. e.g. 6, or 4,6,8 for several) ")
+        try:
+            pin_lengths = parse_pin_lengths(raw)
+        except ValueError:
+            print("Invalid PIN length. Using default 4-digit PINs.")
+            pin_lengths = [4]
 
-    mg.generate_wordlist = choice in ["wordlist", "both"]
-    mg.generate_pinlist = choice in ["pinlist", "both"]
+    want_wordlist = choice in ["wordlist", "both"]
+    want_pinlist = choice in ["pinlist", "both"]
 
-    if mg.generate_wordlist:
+    if want_wordlist:
         mg.leet_enabled = ask_yes_no("Enable leet transformations?")
-        mg.wordlist, mg.wordlist_count = generate_wordlist(mg)
-        filename = input("[+] Save wordlist to filename (default: AwesomeWordlist.txt): ").strip()
-        if not filename:
-            filename = "AwesomeWordlist.txt"
-        save_wordlist(mg.wordlist, filename)
 
-    if mg.generate_pinlist:
-        mg.pinlist, mg.pinlist_count = generate_pinlist(mg, pinlist_length)
-        filename = input("[+] Save PIN list to filename (default: AwesomePINlist.txt): ").strip()
-        if not filename:
-            filename = "AwesomePINlist.txt"
-        save_wordlist(mg.pinlist, filename)
+    if getattr(options, "estimate", False):
+        # dry run: sizes only, nothing is generated or written
+        if want_wordlist:
+            estimate_wordlist(mg)
+        if want_pinlist:
+            estimate_pinlists(mg, pin_lengths)
+        return
+
+    if getattr(options, "crack", None):
+        # test candidates against the hashes; nothing is written
+        hash_type, targets = load_hashes(options.crack, getattr(options, "hash_type", None))
+        found = {}
+        crack_outputs(mg, hash_type, targets, found, want_wordlist, pin_lengths if want_pinlist else [])
+        print_crack_summary(targets, found)
+        if mg.recorder is not None:
+            mg.recorder.save(options.report)
+        return
+
+    wordlist_file = pinlist_file = None
+    if mg.output_stream is not None:
+        # candidates are piped out; the names only matter for a hashcat .rule file
+        wordlist_file = "AwesomeWordlist.txt" if want_wordlist else None
+        pinlist_file = "AwesomePINlist.txt" if want_pinlist else None
+    elif want_wordlist:
+        wordlist_file = input("[+] Save wordlist to filename (default: AwesomeWordlist.txt): ").strip()
+        if not wordlist_file:
+            wordlist_file = "AwesomeWordlist.txt"
+    if want_pinlist and pinlist_file is None:
+        pinlist_file = input("[+] Save PIN list to filename (default: AwesomePINlist.txt): ").strip()
+        if not pinlist_file:
+            pinlist_file = "AwesomePINlist.txt"
+
+    try:
+        generate_outputs(mg, wordlist_file, pinlist_file, pin_lengths if want_pinlist else [])
+    except BrokenPipeError:
+        print("[!] The output reader closed the stream; generation stopped.")
+        return
+    if mg.recorder is not None:
+        mg.recorder.save(options.report)
 
     if mg.generate_wordlist:
         print(f"[+] Wordlist generated with {getattr(mg, 'wordlist_count', 0)} entries.")
@@ -140,3 +362,102 @@ def main_cli():
         print(f"[+] PIN list generated with {getattr(mg, 'pinlist_count', 0)} entries.")
 
     print("\n[+] MagicGuess completed!")
+
+# -------------------------
+# Batch mode
+# -------------------------
+def _batch_outputs(mg, profile_options):
+    """
+    Resolve output files and PIN lengths for a batch profile. Without explicit
+    "wordlist"/"pinlist" options only a wordlist named after the target is written.
+    """
+    slug = sanitize_word(mg.name) or "profile"
+    wordlist_file = profile_options.get("wordlist")
+    pinlist_file = profile_options.get("pinlist")
+    if wordlist_file is None and pinlist_file is None:
+        wordlist_file = True
+    if wordlist_file is True:
+        wordlist_file = f"{slug}_wordlist.txt"
+    if pinlist_file is True:
+        pinlist_file = f"{slug}_PIN{{length}}.txt"
+
+    pin_lengths = profile_options.get("pin_lengths") or [profile_options.get("pin_length", 4)]
+    return wordlist_file or None, pinlist_file or None, [int(n) for n in pin_lengths]
+
+def run_batch(paths, options=None):
+    """
+    Non-interactive mode: load profiles from JSON / JSON Lines files and
+    process them back-to-back in this process. Command-line run options apply
+    to every profile; each profile's "options" object overrides them.
+    """
+    recorder = StageRecorder() if getattr(options, "report", None) else None
+    crack = None
+    if getattr(options, "crack", None):
+        try:
+            hash_type, targets = load_hashes(options.crack, getattr(options, "hash_type", None))
+        except (ValueError, OSError) as e:
+            print(f"[!] Cannot read hashes from {options.crack}: {e}")
+            return False
+        crack = (hash_type, targets, {})
+    done, failed = 0, 0
+    stream_closed = False
+    for path in paths:
+        if stream_closed or (crack is not None and len(crack[2]) == len(crack[1])):
+            break
+        try:
+            for mg, profile_options in load_profiles(path):
+                if mg is None:
+                    print(f"[!] Skipping {profile_options}")
+                    failed += 1
+                    continue
+
+                print(f"\n=== Batch profile: {mg.name} ===")
+                if recorder is not None:
+                    mg.recorder = recorder
+                    recorder.profile = mg.name
+
+                unknown = sorted(set(profile_options) - BATCH_OPTIONS)
+                if unknown:
+                    print(f"[!] Unknown option(s) ignored: {', '.join(unknown)}")
+
+                try:
+                    apply_run_options(mg, options)
+                    apply_run_options(mg, SimpleNamespace(
+                        **{k: v for k, v in profile_options.items() if k in BATCH_OPTIONS}))
+                    mg.leet_enabled = bool(profile_options.get("leet", mg.leet_enabled))
+                    wordlist_file, pinlist_file, pin_lengths = _batch_outputs(mg, profile_options)
+                    if getattr(options, "estimate", False):
+                        if wordlist_file:
+                            estimate_wordlist(mg)
+                        if pinlist_file:
+                            estimate_pinlists(mg, pin_lengths)
+                    elif crack is not None:
+                        hash_type, targets, found = crack
+                        crack_outputs(mg, hash_type, targets, found, bool(wordlist_file),
+                                      pin_lengths if pinlist_file else [])
+                    else:
+                        generate_outputs(mg, wordlist_file, pinlist_file, pin_lengths)
+                except BrokenPipeError:
+                    # the cracker reading the stream exited: nothing left to feed
+                    print("[!] The output reader closed the stream; batch stopped.")
+                    stream_closed = True
+                    break
+                except (ValueError, OSError) as e:
+                    print(f"[!] Profile {mg.name} failed: {e}")
+                    failed += 1
+                    continue
+                done += 1
+                if crack is not None and len(crack[2]) == len(crack[1]):
+                    break
+        except (ValueError, OSError) as e:
+            print(f"[!] Cannot read {path}: {e}")
+            failed += 1
+
+    if crack is not None:
+        print_crack_summary(crack[1], crack[2])
+    print(f"\n[+] Batch completed: {done} profile(s) processed, {failed} failed.")
+    stats = variant_cache_stats().values()
+    print(f"[+] Variant cache: {sum(s['hits'] for s in stats)} hits, {sum(s['misses'] for s in stats)} misses")
+    if recorder is not None:
+        recorder.save(options.report)
+    return failed == 0
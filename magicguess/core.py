@@ -56,5 +56,69 @@ class MasterGuess:
         self.emails = emails or []
         self.leet_enabled = leet_enabled
 
+        # deduplication backend: "memory", "disk" or "bloom" (see magicguess.dedup)
+        self.dedup_mode = "memory"
+        self.dedup_fp_rate = 0.001
+        self.dedup_capacity = 10_000_000
+        # temp file partitions of the disk backend (None: sized from dedup_capacity)
+        self.dedup_partitions = None
+
+        # worker processes for candidate expansion (0 = one per CPU core)
+        self.workers = 1
+
+        # output compression: None, "gz", "bz2" or "xz" (see magicguess.io_handlers)
+        self.output_compression = None
+
+        # split each output file into this many shards plus a JSON manifest,
+        # dealt "round-robin" or "balanced" by size (see io_handlers.ShardedWriter)
+        self.output_shards = 1
+        self.shard_mode = "round-robin"
+
+        # open binary stream (stdout or a FIFO) candidates are piped to
+        # instead of output files; None writes files
+        self.output_stream = None
+
+        # "wordlist" writes fully expanded candidates, "rules" writes base
+        # candidates plus a hashcat .rule file doing the expansion
+        self.export_mode = "wordlist"
+
+        # write PIN<n>_markov.txt when it is missing (the keyspace is
+        # otherwise enumerated on the fly)
+        self.write_base_file = False
+
+        # leet engine (see generators.iter_leet): positions substituted at
+        # once, letter -> substitutes map (None = LEET_MAP), and caps on the
+        # variants per candidate and on the leet candidates of the whole run
+        self.leet_depth = 1
+        self.leet_map = None
+        self.leet_word_budget = None
+        self.leet_budget = None
+
+        # slice of the raw wordlist keyspace to generate (see
+        # generators.wordlist_keyspace): first index and number of indices
+        self.skip = 0
+        self.limit = None
+
+        # password policy of the target system (see magicguess.policy);
+        # None keeps every candidate passing the built-in filters
+        self.policy = None
+
+        # keep only the `top` best scored wordlist candidates, best first,
+        # scored by a magicguess.scoring.ScoringModel (None = default weights)
+        self.top = None
+        self.scoring_model = None
+
+        # trained magicguess.markov.MarkovModel: ranks the wordlist and the
+        # base PIN list by likelihood (and adds to the --top score)
+        self.markov = None
+
+        # already-tried wordlists (see magicguess.exclusion.ExclusionIndex);
+        # None keeps candidates regardless of earlier runs
+        self.exclude = None
+
+        # per-stage timing/memory recorder (see magicguess.instrumentation);
+        # None disables instrumentation
+        self.recorder = None
+
         self.wordlist = []
         self.pinlist = []
@@ -0,0 +1,194 @@
+# crack.py
+
+# In-process hash verification for MagicGuess
+#
+# Candidates are hashed as they are generated and checked against a small set
+# of target hashes, without writing a wordlist. Supported: md5, sha1, sha256
+# and ntlm (MD4 of the UTF-16LE password).
+
+import hashlib
+import multiprocessing
+import struct
+import time
+
+from magicguess.generators import imap_bounded, close_stream
+
+HASH_LENGTHS = {"md5": 32, "sha1": 40, "sha256": 64, "ntlm": 32}
+HASH_TYPES = tuple(HASH_LENGTHS)
+CRACK_CHUNK_SIZE = 5000
+
+
+# -------------------------
+# MD4 (NTLM)
+# -------------------------
+def _md4_fallback(data):
+    """Pure-Python MD4 (RFC 1320), for OpenSSL builds without the legacy md4 digest."""
+    mask = 0xFFFFFFFF
+
+    def rotl(x, n):
+        x &= mask
+        return ((x << n) | (x >> (32 - n))) & mask
+
+    msg = bytearray(data)
+    bit_length = (8 * len(data)) & 0xFFFFFFFFFFFFFFFF
+    msg.append(0x80)
+    msg += bytes((56 - len(msg) % 64) % 64)
+    msg += struct.pack("<Q", bit_length)
+
+    a, b, c, d = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+    for offset in range(0, len(msg), 64):
+        x = struct.unpack("<16I", msg[offset:offset + 64])
+        aa, bb, cc, dd = a, b, c, d
+
+        for i in (0, 4, 8, 12):
+            a = rotl(a + ((b & c) | (~b & d)) + x[i], 3)
+            d = rotl(d + ((a & b) | (~a & c)) + x[i + 1], 7)
+            c = rotl(c + ((d & a) | (~d & b)) + x[i + 2], 11)
+            b = rotl(b + ((c & d) | (~c & a)) + x[i + 3], 19)
+
+        for i in (0, 1, 2, 3):
+            a = rotl(a + ((b & c) | (b & d) | (c & d)) + x[i] + 0x5A827999, 3)
+            d = rotl(d + ((a & b) | (a & c) | (b & c)) + x[i + 4] + 0x5A827999, 5)
+            c = rotl(c + ((d & a) | (d & b) | (a & b)) + x[i + 8] + 0x5A827999, 9)
+            b = rotl(b + ((c & d) | (c & a) | (d & a)) + x[i + 12] + 0x5A827999, 13)
+
+        for i in (0, 2, 1, 3):
+            a = rotl(a + (b ^ c ^ d) + x[i] + 0x6ED9EBA1, 3)
+            d = rotl(d + (a ^ b ^ c) + x[i + 8] + 0x6ED9EBA1, 9)
+            c = rotl(c + (d ^ a ^ b) + x[i + 4] + 0x6ED9EBA1, 11)
+            b = rotl(b + (c ^ d ^ a) + x[i + 12] + 0x6ED9EBA1, 15)
+
+        a, b, c, d = (a + aa) & mask, (b + bb) & mask, (c + cc) & mask, (d + dd) & mask
+
+    return struct.pack("<4I", a, b, c, d)
+
+
+def _md4(data):
+    return hashlib.new("md4", data).digest()
+
+
+try:
+    _md4(b"")
+except ValueError:
+    _md4 = _md4_fallback
+
+
+# -------------------------
+# Hash functions
+# -------------------------
+def _hash_md5(word):
+    return hashlib.md5(word.encode("utf-8")).hexdigest()
+
+
+def _hash_sha1(word):
+    return hashlib.sha1(word.encode("utf-8")).hexdigest()
+
+
+def _hash_sha256(word):
+    return hashlib.sha256(word.encode("utf-8")).hexdigest()
+
+
+def _hash_ntlm(word):
+    return _md4(word.encode("utf-16-le")).hex()
+
+
+HASH_FUNCTIONS = {"md5": _hash_md5, "sha1": _hash_sha1, "sha256": _hash_sha256, "ntlm": _hash_ntlm}
+
+
+def hash_candidate(word, hash_type):
+    """Hex digest of a candidate for one of HASH_TYPES."""
+    return HASH_FUNCTIONS[hash_type](word)
+
+
+def detect_hash_type(digest):
+    """Infer the hash type from a hex digest's length; 32 characters (md5 / ntlm) is ambiguous."""
+    matches = [name for name, n in HASH_LENGTHS.items() if n == len(digest)]
+    if len(matches) != 1:
+        raise ValueError(f"Cannot infer the hash type of a {len(digest)}-character hash "
+                         f"(candidates: {', '.join(matches) or 'none'}); pass --hash-type")
+    return matches[0]
+
+
+# -------------------------
+# Checking candidates
+# -------------------------
+_worker_state = None
+
+
+def _init_worker(hash_type, targets):
+    global _worker_state
+    _worker_state = (HASH_FUNCTIONS[hash_type], targets)
+
+
+def _find_hits(hash_func, targets, words):
+    """Returns (number of words hashed, [(hash, word) for every target hit])."""
+    hits = []
+    for w in words:
+        digest = hash_func(w)
+        if digest in targets:
+            hits.append((digest, w))
+    return len(words), hits
+
+
+def _check_chunk(words):
+    """Runs in worker processes; the targets are sent once by the pool initializer."""
+    hash_func, targets = _worker_state
+    return _find_hits(hash_func, targets, words)
+
+
+def _iter_chunks(candidates, size=CRACK_CHUNK_SIZE):
+    chunk = []
+    for w in candidates:
+        chunk.append(w)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def crack_candidates(candidates, hash_type, targets, workers=1, found=None):
+    """
+    Hash a candidate stream and check it against the target hashes (lowercase
+    hex digests), across `workers` processes. Hits are printed as they are
+    found and added to `found` ({hash: candidate}); the stream is abandoned as
+    soon as every target has been found. Returns the number of candidates tested.
+    """
+    found = {} if found is None else found
+    remaining = set(targets) - set(found)
+    if not remaining:
+        return 0
+
+    tested = 0
+    start = time.perf_counter()
+
+    def consume(results):
+        nonlocal tested
+        for count, hits in results:
+            tested += count
+            for digest, word in hits:
+                if digest in remaining:
+                    remaining.discard(digest)
+                    found[digest] = word
+                    print(f"[+] Cracked {digest}:{word}")
+            if not remaining:
+                print("[+] Every target hash cracked; stopping early.")
+                return
+
+    chunks = _iter_chunks(candidates)
+    try:
+        if workers <= 1:
+            hash_func = HASH_FUNCTIONS[hash_type]
+            consume(_find_hits(hash_func, remaining, chunk) for chunk in chunks)
+        else:
+            with multiprocessing.Pool(workers, initializer=_init_worker,
+                                      initargs=(hash_type, frozenset(remaining))) as pool:
+                consume(imap_bounded(pool, _check_chunk, chunks, workers * 4))
+    except BaseException as e:
+        close_stream(candidates, e)
+        raise
+    close_stream(candidates)
+
+    elapsed = time.perf_counter() - start
+    print(f"[+] Tested {tested:,} candidates in {elapsed:.1f}s ({tested / max(elapsed, 1e-9):,.0f}/s)")
+    return tested
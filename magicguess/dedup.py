@@ -0,0 +1,283 @@
+# dedup.py
+
+# Pluggable deduplication backends for MagicGuess
+#
+#   memory : exact, keeps every unique candidate in a Python set (default)
+#   disk   : exact, streams with a bounded in-memory set of 64-bit keys that
+#            spills to sorted, hash-partitioned temp files
+#   bloom  : approximate, fixed-size Bloom filter with a configurable false-positive rate
+#
+# Every backend has unique(items), a lazy stream of the first occurrences, and
+# unique_batches(batches), which yields the first occurrences of each batch as
+# a list, for callers that work a chunk at a time.
+
+import array
+import hashlib
+import heapq
+import math
+import os
+import tempfile
+
+from magicguess.utils import iter_unique, word_key, map_keys, has_key
+
+DEDUP_MODES = ("memory", "disk", "bloom")
+DEFAULT_FP_RATE = 0.001
+DEFAULT_CAPACITY = 10_000_000
+# in-memory key set of the disk backend; a set entry of an int key takes ~72 bytes
+DEFAULT_DISK_MEMORY = 64 * 1024 * 1024
+_PENDING_KEY_BYTES = 72
+MAX_PARTITIONS = 4096
+
+
+# -------------------------
+# Exact, in-memory
+# -------------------------
+class MemoryDeduper:
+    """
+    Exact deduplication with a Python set. Fast, but memory grows with the output.
+    """
+    def unique(self, items):
+        return iter_unique(items)
+
+    def unique_batches(self, batches):
+        seen = set()
+        add = seen.add
+        for batch in batches:
+            # add() returns None, so a word is kept the first time it is seen
+            yield [w for w in batch if not (w in seen or add(w))]
+
+
+# -------------------------
+# Exact, disk-backed
+# -------------------------
+def disk_partitions(capacity=DEFAULT_CAPACITY, memory=DEFAULT_DISK_MEMORY):
+    """
+    Partition count for DiskDeduper: enough that a partition holds about one
+    in-memory batch of keys at the expected number of unique candidates.
+    """
+    batch = max(1, int(memory) // _PENDING_KEY_BYTES)
+    return min(MAX_PARTITIONS, max(1, math.ceil(int(capacity) / batch)))
+
+
+class _KeyRun:
+    """A sorted file of 64-bit keys, memory-mapped and searched by bisection."""
+    def __init__(self, path, keys):
+        self.path = path
+        with open(path, "wb") as fh:
+            keys.tofile(fh)
+        self.keys = map_keys(path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return has_key(self.keys, key)
+
+    def close(self):
+        mm = self.keys.obj
+        self.keys.release()
+        mm.close()
+        os.remove(self.path)
+
+
+class DiskDeduper:
+    """
+    Exact, order-preserving, streaming deduplication with bounded memory.
+
+    Every candidate is reduced to a 64-bit key. New keys go to an in-memory
+    set of at most `memory` bytes; when it is full, its keys are sorted into
+    one run file per partition (by key), and a candidate is a duplicate if its
+    key is in the set or in a run of its partition. Runs of a partition are
+    merged whenever the newest is at least as large as the previous one, so
+    a partition keeps O(log n) runs. Each candidate is output as soon as it
+    is found new, so --stdout/--fifo consumers are fed from the start.
+    """
+    def __init__(self, partitions=None, tmp_dir=None, capacity=DEFAULT_CAPACITY,
+                 memory=DEFAULT_DISK_MEMORY):
+        self.batch = max(1, int(memory) // _PENDING_KEY_BYTES)
+        self.partitions = max(1, int(partitions)) if partitions else disk_partitions(capacity, memory)
+        self.tmp_dir = tmp_dir
+        self._runs_written = 0
+
+    def unique(self, items):
+        for batch in self.unique_batches([w] for w in items):
+            yield from batch
+
+    def unique_batches(self, batches):
+        with tempfile.TemporaryDirectory(prefix="mg_dedup_", dir=self.tmp_dir) as tmp:
+            runs = [[] for _ in range(self.partitions)]
+            pending = set()
+            try:
+                for batch in batches:
+                    new = []
+                    for w in batch:
+                        key = word_key(w.encode("utf-8"))
+                        if key in pending:
+                            continue
+                        if any(key in run for run in runs[key % self.partitions]):
+                            continue
+                        pending.add(key)
+                        new.append(w)
+                    yield new
+                    if len(pending) >= self.batch:
+                        self._flush(pending, runs, tmp)
+                        pending = set()
+            finally:
+                for partition in runs:
+                    for run in partition:
+                        run.close()
+
+    def _flush(self, pending, runs, tmp):
+        buckets = [[] for _ in range(self.partitions)]
+        for key in pending:
+            buckets[key % self.partitions].append(key)
+        for i, bucket in enumerate(buckets):
+            if not bucket:
+                continue
+            bucket.sort()
+            partition = runs[i]
+            partition.append(_KeyRun(self._run_path(tmp, i), array.array("Q", bucket)))
+            # keys are unique across runs, so merging is a plain sorted merge
+            while len(partition) > 1 and len(partition[-1]) >= len(partition[-2]):
+                newer, older = partition.pop(), partition.pop()
+                merged = array.array("Q", heapq.merge(older.keys, newer.keys))
+                older.close()
+                newer.close()
+                partition.append(_KeyRun(self._run_path(tmp, i), merged))
+
+    def _run_path(self, tmp, partition):
+        self._runs_written += 1
+        return os.path.join(tmp, f"part{partition:04d}_{self._runs_written:06d}.keys")
+
+
+# -------------------------
+# Exact, fixed-length PINs
+# -------------------------
+class PinBitmap:
+    """
+    Exact set of fixed-length decimal PINs, one bit per possible PIN.
+
+    The bit array is split into 1 MB pages allocated on first use, so a handful
+    of PINs costs a page or two while a fully populated 8-digit keyspace costs
+    12.5 MB (125 MB for 9 digits, 1.25 GB for 10) instead of gigabytes of strings.
+    """
+    PAGE_SHIFT = 23
+    PAGE_BYTES = 1 << (PAGE_SHIFT - 3)
+
+    def __init__(self, length):
+        self.length = int(length)
+        self.pages = {}
+        self.count = 0
+
+    def _locate(self, pin):
+        i = int(pin)
+        return i >> self.PAGE_SHIFT, (i >> 3) & (self.PAGE_BYTES - 1), 1 << (i & 7)
+
+    def add(self, pin):
+        """
+        Add a PIN. Returns True if it was already present.
+        """
+        page_no, byte, mask = self._locate(pin)
+        page = self.pages.get(page_no)
+        if page is None:
+            page = self.pages[page_no] = bytearray(self.PAGE_BYTES)
+        if page[byte] & mask:
+            return True
+        page[byte] |= mask
+        self.count += 1
+        return False
+
+    def __contains__(self, pin):
+        page_no, byte, mask = self._locate(pin)
+        page = self.pages.get(page_no)
+        return page is not None and bool(page[byte] & mask)
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return len(self.pages) * self.PAGE_BYTES
+
+
+# -------------------------
+# Approximate, Bloom filter
+# -------------------------
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` items at `fp_rate` false positives.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, fp_rate=DEFAULT_FP_RATE):
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        capacity = max(1, int(capacity))
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, item):
+        """
+        Add an item. Returns True if it was (probably) already present.
+        """
+        present = True
+        bits = self.bits
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class BloomDeduper:
+    """
+    Approximate deduplication in constant memory. A small fraction (~fp_rate)
+    of genuinely new candidates may be dropped as false duplicates.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, fp_rate=DEFAULT_FP_RATE):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+
+    def unique(self, items):
+        for batch in self.unique_batches([w] for w in items):
+            yield from batch
+
+    def unique_batches(self, batches):
+        bloom = BloomFilter(self.capacity, self.fp_rate)
+        print(f"[+] Bloom dedup: {bloom.num_bits / 8 / 1024 / 1024:.1f} MB, "
+              f"{bloom.num_hashes} hashes, capacity {bloom.capacity:,} at fp {bloom.fp_rate}")
+        warned = False
+        for batch in batches:
+            yield [w for w in batch if not bloom.add(w)]
+            if not warned and bloom.count > bloom.capacity:
+                print("[!] Bloom dedup capacity exceeded — false-positive rate will rise.")
+                warned = True
+
+
+def make_deduper(mode="memory", fp_rate=DEFAULT_FP_RATE, capacity=DEFAULT_CAPACITY,
+                 partitions=None, tmp_dir=None):
+    """
+    Build a deduplication backend by name (see DEDUP_MODES).
+    """
+    if mode == "memory":
+        return MemoryDeduper()
+    if mode == "disk":
+        return DiskDeduper(partitions=partitions, tmp_dir=tmp_dir, capacity=capacity)
+    if mode == "bloom":
+        return BloomDeduper(capacity=capacity, fp_rate=fp_rate)
+    raise ValueError(f"Unknown dedup mode: {mode!r} (expected one of {', '.join(DEDUP_MODES)})")
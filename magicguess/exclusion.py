@@ -0,0 +1,202 @@
+# exclusion.py
+
+# Exclusion filter for MagicGuess: skip candidates already present in
+# wordlists that were tried before (rockyou-class lists, previous runs).
+#
+# Each wordlist is indexed once into a sidecar file next to it, e.g.
+# rockyou.txt.mgex:
+#   header (magic, version, byte order, count, source size, source mtime)
+#   followed by the sorted, unique 64-bit BLAKE2b keys of its lines.
+# The keys are memory-mapped and searched with bisect, so a lookup costs a
+# hash and ~25 comparisons in C, and memory use does not grow with the list.
+
+import array
+import hashlib
+import heapq
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from magicguess.io_handlers import COMPRESSIONS
+from magicguess.utils import word_key, map_keys, has_key
+
+EXCLUDE_SUFFIX = ".mgex"
+EXCLUDE_MAGIC = b"MGEX"
+EXCLUDE_VERSION = 1
+EXCLUDE_HEADER = struct.Struct("<4sBcQQq")
+# keys sorted in memory at once while building; sorted runs are merged from disk
+EXCLUDE_RUN_SIZE = 1 << 20
+EXCLUDE_READ_BLOCK = 1 << 16
+
+# mapped key tables per (index path, mtime), shared by every ExclusionIndex of
+# this process: worker processes unpickle one per task and map each file once
+_tables_cache = {}
+
+
+def _iter_wordlist_lines(path):
+    """Raw lines of a (possibly compressed) wordlist, without line endings."""
+    opener = open
+    for ext, comp_open in COMPRESSIONS.values():
+        if path.name.endswith(ext):
+            opener = comp_open
+    with opener(path, "rb") as fh:
+        for line in fh:
+            line = line.rstrip(b"\r\n")
+            if line:
+                yield line
+
+
+def _index_paths(source):
+    """Sidecar next to the wordlist first, then a per-user temp location."""
+    yield source.with_name(source.name + EXCLUDE_SUFFIX)
+    tag = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+    yield Path(tempfile.gettempdir()) / f"{source.name}.{tag}{EXCLUDE_SUFFIX}"
+
+
+def _read_header(index_file, source):
+    """Return the key count of a valid, up-to-date index, or None."""
+    try:
+        stat = source.stat()
+        with index_file.open("rb") as fh:
+            header = fh.read(EXCLUDE_HEADER.size)
+        size = index_file.stat().st_size
+    except OSError:
+        return None
+    if len(header) != EXCLUDE_HEADER.size:
+        return None
+    magic, version, byteorder, count, src_size, src_mtime = EXCLUDE_HEADER.unpack(header)
+    if (magic != EXCLUDE_MAGIC or version != EXCLUDE_VERSION or byteorder != sys.byteorder[0].encode()
+            or src_size != stat.st_size or src_mtime != stat.st_mtime_ns
+            or size != EXCLUDE_HEADER.size + count * 8):
+        return None
+    return count
+
+
+def _write_run(keys, tmp_dir, runs):
+    keys.sort()
+    path = os.path.join(tmp_dir, f"run{len(runs):05d}")
+    with open(path, "wb") as fh:
+        array.array("Q", keys).tofile(fh)
+    runs.append(path)
+
+
+def _iter_run(path):
+    with open(path, "rb") as fh:
+        while True:
+            block = array.array("Q")
+            block.frombytes(fh.read(EXCLUDE_READ_BLOCK * 8))
+            if not block:
+                return
+            yield from block
+
+
+def build_index(source, index_file):
+    """
+    Hash every line of the wordlist, sort the keys in bounded-memory runs and
+    merge them into the index. Written to a temporary file and renamed, so
+    readers never see a partial index. Returns the number of unique keys.
+    """
+    stat = source.stat()
+    print(f"[+] Indexing {source.name} into {index_file}...")
+    tmp_file = index_file.with_name(index_file.name + f".{os.getpid()}.tmp")
+    count = 0
+    try:
+        with tempfile.TemporaryDirectory(prefix="mg_exclude_", dir=index_file.parent) as tmp_dir:
+            runs = []
+            keys = []
+            for line in _iter_wordlist_lines(source):
+                keys.append(word_key(line))
+                if len(keys) >= EXCLUDE_RUN_SIZE:
+                    _write_run(keys, tmp_dir, runs)
+                    keys = []
+            if keys:
+                _write_run(keys, tmp_dir, runs)
+
+            with tmp_file.open("wb") as fh:
+                fh.write(bytes(EXCLUDE_HEADER.size))
+                batch = array.array("Q")
+                last = None
+                for key in heapq.merge(*(_iter_run(r) for r in runs)):
+                    if key != last:
+                        batch.append(key)
+                        last = key
+                        if len(batch) >= EXCLUDE_READ_BLOCK:
+                            batch.tofile(fh)
+                            count += len(batch)
+                            batch = array.array("Q")
+                batch.tofile(fh)
+                count += len(batch)
+                fh.seek(0)
+                fh.write(EXCLUDE_HEADER.pack(EXCLUDE_MAGIC, EXCLUDE_VERSION, sys.byteorder[0].encode(),
+                                             count, stat.st_size, stat.st_mtime_ns))
+        os.replace(tmp_file, index_file)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        raise
+
+    print(f"[+] Indexed {count:,} unique words from {source.name}")
+    return count
+
+
+def ensure_index(source):
+    """
+    Return the path of an up-to-date index for a wordlist, building it when
+    it is missing or stale (size or mtime changed).
+    """
+    source = Path(source)
+    if not source.is_file():
+        raise ValueError(f"Exclusion wordlist not found: {source}")
+    error = None
+    for index_file in _index_paths(source):
+        if _read_header(index_file, source) is not None:
+            return index_file
+    for index_file in _index_paths(source):
+        try:
+            build_index(source, index_file)
+            return index_file
+        except OSError as e:
+            error = e
+            print(f"[!] Could not write {index_file}: {e}")
+    raise OSError(f"Cannot index {source}: {error}")
+
+
+class ExclusionIndex:
+    """
+    Membership test against one or more indexed wordlists.
+    Only the index paths are pickled; worker processes map the files themselves.
+    """
+    def __init__(self, sources):
+        self.paths = [ensure_index(s) for s in sources]
+        self._tables = None
+
+    def __getstate__(self):
+        return {"paths": self.paths}
+
+    def __setstate__(self, state):
+        self.paths = state["paths"]
+        self._tables = None
+
+    def _open(self):
+        self._tables = []
+        for path in self.paths:
+            stat = path.stat()
+            if stat.st_size == EXCLUDE_HEADER.size:
+                continue
+            key = (path, stat.st_mtime_ns)
+            if key not in _tables_cache:
+                _tables_cache[key] = map_keys(path, EXCLUDE_HEADER.size)
+            self._tables.append(_tables_cache[key])
+        return self._tables
+
+    def __len__(self):
+        return sum(len(t) for t in (self._tables if self._tables is not None else self._open()))
+
+    def __contains__(self, word):
+        tables = self._tables if self._tables is not None else self._open()
+        key = word_key(word.encode("utf-8"))
+        return any(has_key(keys, key) for keys in tables)
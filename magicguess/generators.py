@@ -1,9 +1,24 @@
 # generators.py
 
-from magicguess.utils import sanitize_word, dedupe, normalize_string, all_upper
+from magicguess.utils import sanitize_word, dedupe, normalize_string, all_upper, variant_cache
+from magicguess.dedup import make_deduper, PinBitmap, DEFAULT_FP_RATE, DEFAULT_CAPACITY
+from magicguess.instrumentation import get_recorder
+from magicguess.pinstats import iter_frequency_pins
+from magicguess.policy import char_classes
+from magicguess.scoring import ScoringModel
 from datetime import datetime
 from pathlib import Path
+import array
+import codecs
+import collections
+import heapq
 import itertools
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import sys
 
 SPECIAL_CHARS = ['!', '@', '#', '$', '%', '&', '*', '"']
 MIN_WORDLIST_LENGTH = 6
@@ -11,6 +26,7 @@ MIN_WORDLIST_LENGTH = 6
 # -------------------------
 # LEET MAPPING
 # -------------------------
+# Substitutes are listed most likely first
 LEET_MAP = {
     "a": ["4", "@"],
     "e": ["3"],
@@ -18,21 +34,75 @@ LEET_MAP = {
     "o": ["0"],
     "s": ["5"]
 }
+LEET_DEPTH = 1
 
-def apply_leet(word):
+def iter_leet(word, depth=LEET_DEPTH, leet_map=None, limit=None):
     """
-    Applies substitutions, only 1 letter at a time to avoid explosion.
+    Lazily yield the leet variants of a word (not the word itself), with up to
+    `depth` positions substituted at once, most likely first: fewer
+    substitutions first, then the lower summed rank of the substitutes in the
+    map, then left to right. Stops after `limit` variants.
     """
-    variants = set([word])
+    for _, variant in _iter_leet_levels(word, depth, leet_map, limit):
+        yield variant
 
-    for idx, ch in enumerate(word.lower()):
-        if ch in LEET_MAP:
-            for sub in LEET_MAP[ch]:
-                new_word = list(word)
-                new_word[idx] = sub
-                variants.add("".join(new_word))
+def _iter_leet_levels(word, depth=LEET_DEPTH, leet_map=None, limit=None):
+    """iter_leet(), yielding (number of substituted letters, variant)."""
+    positions = _leet_positions(word, leet_map)
+    if limit is not None and limit <= 0:
+        return
 
-    return list(variants)
+    seen = {word}
+    for k in range(1, min(depth, len(positions)) + 1):
+        # one substitution level at a time, so deeper levels are only built when reached
+        if k == 1:
+            variants = _leet_singles(word, positions)
+        else:
+            plans = []
+            for combo in itertools.combinations(positions, k):
+                for ranks in itertools.product(*(range(len(subs)) for _, subs in combo)):
+                    plans.append((sum(ranks), tuple(idx for idx, _ in combo), ranks, combo))
+            plans.sort(key=lambda plan: plan[:3])
+            variants = (_substitute(word, combo, ranks) for _, _, ranks, combo in plans)
+
+        for variant in variants:
+            if variant not in seen:
+                seen.add(variant)
+                yield k, variant
+                if limit is not None and len(seen) > limit:
+                    return
+
+def _leet_positions(word, leet_map=None):
+    leet_map = LEET_MAP if leet_map is None else leet_map
+    return [(idx, leet_map[ch]) for idx, ch in enumerate(word.lower()) if ch in leet_map]
+
+def _leet_singles(word, positions):
+    """Single substitutions, by substitute rank and then left to right."""
+    variants = []
+    rank = 0
+    while positions:
+        positions = [(idx, subs) for idx, subs in positions if rank < len(subs)]
+        for idx, subs in positions:
+            variants.append(word[:idx] + subs[rank] + word[idx + 1:])
+        rank += 1
+    return variants
+
+def _substitute(word, combo, ranks):
+    chars = list(word)
+    for (idx, subs), rank in zip(combo, ranks):
+        chars[idx] = subs[rank]
+    return "".join(chars)
+
+def apply_leet(word, depth=LEET_DEPTH, leet_map=None, limit=None):
+    """
+    Returns the word followed by its leet variants (see iter_leet).
+    The default substitutes 1 letter at a time to avoid explosion.
+    """
+    if depth == 1 and limit is None:
+        # the default: skip the generator machinery on this hot path; repeats
+        # (a substitute equal to its letter) are left to the global dedup
+        return [word] + _leet_singles(word, _leet_positions(word, leet_map))
+    return [word] + list(iter_leet(word, depth, leet_map, limit))
 
 
 # -------------------------
@@ -85,6 +155,7 @@ def string_to_t9_multi(s: str) -> str:
 # -------------------------
 # Toggle case of individual words
 # -------------------------
+@variant_cache()
 def toggle_case(word):
     """
     Generate case toggles for a single word.
@@ -98,6 +169,7 @@ def toggle_case(word):
 # -------------------------
 # Name variants
 # -------------------------
+@variant_cache()
 def name_variants(full_name: str):
     """
     Generates variations:
@@ -176,6 +248,7 @@ def name_variants(full_name: str):
 # -------------------------
 # Date variants
 # -------------------------
+@variant_cache()
 def date_variants(d):
     """
     Generate date variants from a datetime object.
@@ -192,17 +265,17 @@ def date_variants(d):
     year_full = str(d.year)
     year_short = year_full[-2:]
 
-    variants = set()
+    variants = []
     for day in days:
         for month in months:
             for year in [year_full, year_short]:
-                variants.add(f"{day}{month}{year}")
-                variants.add(f"{month}{day}{year}")  # inverted
+                variants.append(f"{day}{month}{year}")
+                variants.append(f"{month}{day}{year}")  # inverted
 
-    variants.add(year_full)
-    variants.add(year_short)
+    variants.append(year_full)
+    variants.append(year_short)
 
-    return list(dedupe(variants))
+    return dedupe(variants)
 
 # -------------------------
 # Special characters
@@ -219,15 +292,19 @@ def special_chars_variants(word):
         variants.append(c + word + c)
     return variants
 
+# (placement, character) of each special_chars_variants() entry, in order
+SPECIAL_VARIANT_FEATURES = [("none", None)] + [(placement, c) for c in SPECIAL_CHARS
+                                               for placement in ("prefix", "suffix", "both")]
+
 # -------------------------
 # Common numbers
 # -------------------------
-def append_common_numbers(word):
-    # -------------------------------------------------------------------------
-    # ADD RANDOM NUMBERS                                           
-    COMMON_NUMBERS = ["1", "123", "1234", "69", "7", "17", "123456"]
-    # -------------------------------------------------------------------------
+# -------------------------------------------------------------------------
+# ADD RANDOM NUMBERS
+COMMON_NUMBERS = ["1", "123", "1234", "69", "7", "17", "123456"]
+# -------------------------------------------------------------------------
 
+def append_common_numbers(word):
     return [word + n for n in COMMON_NUMBERS]
 
 # ---------------------------------------------------------
@@ -236,14 +313,12 @@ def append_common_numbers(word):
 
 def process_person_for_combinations(person, target_last, target_name_variants, target_dates):
     """Process relations or children: remove duplicate nickname, generate variants,
-       and return processed structure + own wordlist."""
-    
-    all_words = []
+       and return processed structure + a lazy iterator over its own words."""
 
     # --- nome ---
     raw_name = person.get("name", "")
     if not raw_name:
-        return None, []
+        return None, iter(())
 
     parts_raw = [p for p in raw_name.strip().split() if p]
     parts = [sanitize_word(p) for p in parts_raw]
@@ -255,7 +330,7 @@ def process_person_for_combinations(person, target_last, target_name_variants, t
         parts = parts[:-1]
 
     if not parts:
-        return None, []
+        return None, iter(())
 
     clean_name = " ".join(parts)
     name_vars = name_variants(clean_name)
@@ -267,24 +342,31 @@ def process_person_for_combinations(person, target_last, target_name_variants, t
     # --- dates ---
     person_dates = date_variants(person.get("birth")) if person.get("birth") else []
 
-    # --- isolated variants ---
-    all_words += name_vars
-    for n in name_vars:
-        for dt in person_dates + target_dates:
-            all_words.append(n + dt)
-
-    all_words += nickname_vars
-    for nn in nickname_vars:
-        for dt in person_dates + target_dates:
-            all_words.append(nn + dt)
-
     processed = {
         "name_vars": name_vars,
         "nickname_vars": nickname_vars,
-        "dates": person_dates
+        "dates": person_dates,
+        # snapshot: the shared date list keeps growing after this person
+        "combo_dates": person_dates + list(target_dates)
     }
 
-    return processed, all_words
+    return processed, _iter_person_words(processed)
+
+
+def _iter_person_words(processed):
+    """Lazily yield the isolated words of a processed relation or child."""
+    combo_dates = processed["combo_dates"]
+
+    # --- isolated variants ---
+    yield from processed["name_vars"]
+    for n in processed["name_vars"]:
+        for dt in combo_dates:
+            yield n + dt
+
+    yield from processed["nickname_vars"]
+    for nn in processed["nickname_vars"]:
+        for dt in combo_dates:
+            yield nn + dt
 
 # -------------------------
 # PETS
@@ -296,18 +378,17 @@ def process_pet_for_combinations(pet, target_name_variants, target_dates):
       - Nickname of the pet
       - Combos target <-> pet
       - Combos between pets (without dates)
+    Words are returned as a lazy iterator.
     """
-    all_words = []
-
     raw_name = pet.get("name", "")
     if not raw_name:
-        return None, []
+        return None, iter(())
 
     parts_raw = [p for p in raw_name.strip().split() if p]
     parts = [sanitize_word(p) for p in parts_raw]
 
     if not parts:
-        return None, []
+        return None, iter(())
 
     clean_name = " ".join(parts)
     name_vars = name_variants(clean_name)
@@ -317,37 +398,46 @@ def process_pet_for_combinations(pet, target_name_variants, target_dates):
 
     pet_dates = date_variants(pet.get("birth")) if pet.get("birth") else []
 
+    processed = {
+        "name_vars": name_vars,
+        "nickname_vars": nickname_vars,
+        "dates": pet_dates,
+        # snapshot: the shared date list keeps growing after this pet
+        "combo_dates": list(target_dates) + pet_dates
+    }
+
+    return processed, _iter_pet_words(processed, target_name_variants)
+
+
+def _iter_pet_words(processed, target_name_variants):
+    """Lazily yield the isolated words of a processed pet and its target combos."""
+    name_vars = processed["name_vars"]
+    nickname_vars = processed["nickname_vars"]
+    combo_dates = processed["combo_dates"]
+
     # --- Isolated words of the pet ---
-    all_words += name_vars
-    all_words += nickname_vars
+    yield from name_vars
+    yield from nickname_vars
 
     # --- Combos target <-> pet ---
     for tn in target_name_variants:
         for nv in name_vars:
             # target+pet
-            all_words.append(tn + nv)
-            all_words.append(nv + tn)
+            yield tn + nv
+            yield nv + tn
             # with dates: only one date per combination
-            for dt in target_dates + pet_dates:
-                all_words.append(tn + nv + dt)
-                all_words.append(nv + tn + dt)
+            for dt in combo_dates:
+                yield tn + nv + dt
+                yield nv + tn + dt
 
         for nn in nickname_vars:
             # target+nickname
-            all_words.append(tn + nn)
-            all_words.append(nn + tn)
+            yield tn + nn
+            yield nn + tn
             # with dates
-            for dt in target_dates + pet_dates:
-                all_words.append(tn + nn + dt)
-                all_words.append(nn + tn + dt)
-
-    processed = {
-        "name_vars": name_vars,
-        "nickname_vars": nickname_vars,
-        "dates": pet_dates
-    }
-
-    return processed, all_words
+            for dt in combo_dates:
+                yield tn + nn + dt
+                yield nn + tn + dt
 
 # -------------------------
 # Combos between pets
@@ -357,12 +447,10 @@ def combine_pets(processed_pets):
     Combine names/nicknames between pets.
     NEVER use dates or create passwords with only dates.
     """
-    pet_words = []
     for p1, p2 in itertools.permutations(processed_pets, 2):
         for n1 in p1["name_vars"] + p1["nickname_vars"]:
             for n2 in p2["name_vars"] + p2["nickname_vars"]:
-                pet_words.append(n1 + n2)
-    return pet_words
+                yield n1 + n2
 
 
 # -------------------------
@@ -393,86 +481,52 @@ def _collect_dates(profile):
 
 
 def _process_people(list_of_people, target_last, target_name_variants, date_list):
-    words = []
     processed = []
+    word_iters = []
     for person in list_of_people:
         pproc, pwords = process_person_for_combinations(person, target_last, target_name_variants, date_list)
         if not pproc:
             continue
         processed.append(pproc)
-        words += pwords
+        word_iters.append(pwords)
         for dt in pproc.get("dates", []):
             date_list.append(dt)
         # progress print per person
-        print(f"[+] Processed person: {person.get('name','(unnamed)')} — added {len(pwords)} words")
-    return processed, words
+        print(f"[+] Processed person: {person.get('name','(unnamed)')} — "
+              f"{len(pproc['name_vars']) + len(pproc['nickname_vars'])} name variants")
+    return processed, itertools.chain.from_iterable(word_iters)
 
 
 def _process_pets(pets, target_name_variants, date_list):
-    words = []
     processed = []
+    word_iters = []
     for pet in pets:
         pproc, pwords = process_pet_for_combinations(pet, target_name_variants, date_list)
         if not pproc:
             continue
         processed.append(pproc)
-        words += pwords
+        word_iters.append(pwords)
         for dt in pproc.get("dates", []):
             date_list.append(dt)
         # progress print per pet
-        print(f"[+] Processed pet: {pet.get('name','(unnamed)')} — added {len(pwords)} words")
-    return processed, words
+        print(f"[+] Processed pet: {pet.get('name','(unnamed)')} — "
+              f"{len(pproc['name_vars']) + len(pproc['nickname_vars'])} name variants")
+    return processed, itertools.chain.from_iterable(word_iters)
 
 
 def _combine_entity_date_combos(all_entities, date_list):
-    combos = []
     for entity in all_entities:
         for dtv in date_list:
-            combos.append(entity + dtv)
-            combos.append(dtv + entity)
-    return combos
-
-
-def _apply_final_transforms(words, profile):
-    # apply common numbers
-    for w in list(words):
-        words += append_common_numbers(w)
-    print(f"[+] After appending common numbers: {len(words)} items")
+            yield entity + dtv
+            yield dtv + entity
 
-    # special chars
-    final_words = []
-    for w in words:
-        final_words += special_chars_variants(w)
-    print(f"[+] After applying special characters variants: {len(final_words)} items")
-
-    # leet
-    if getattr(profile, "leet_enabled", False):
-        leet_words = []
-        for w in final_words:
-            leet_words += apply_leet(w)
-        final_words += leet_words
-        print(f"[+] After applying leet transformations: {len(final_words)} items")
-
-    # dedupe and filter
-    final_words = dedupe(final_words)
-    print(f"[+] After deduplication: {len(final_words)} unique items")
-    filtered = []
-    for w in final_words:
-        if len(w) < MIN_WORDLIST_LENGTH:
-            continue
-        if w.isdigit():
-            continue
-        if all(c in SPECIAL_CHARS for c in w):
-            continue
-        if all_upper(w):
-            continue
-        filtered.append(w)
 
-    return filtered
-
-
-def generate_wordlist(profile):
-    print("[+] Starting wordlist generation...")
+def _build_wordlist_context(profile):
+    """
+    Compute the small, eagerly-built pieces of a wordlist run (name variants,
+    dates, processed relations/children/pets). Candidate words are never
+    materialized here; see _iter_base_words.
+    """
     # target name variants
     target_name_variants = _collect_target_variants(profile)
     print(f"[+] Target name variants: {len(target_name_variants)}")
@@ -491,67 +545,905 @@ def generate_wordlist(profile):
     # prepare target last name for person processing
     target_last = sanitize_word(profile.name.strip().split()[-1]).lower() if profile.name else ""
 
-    # relations
-    processed_relations, relation_words = _process_people(profile.relationships, target_last, target_name_variants, date_list)
-    print(f"[+] Relations processed: {len(processed_relations)} — relation words {len(relation_words)}")
+    # relations, children and pets (their word iterators are discarded here
+    # and rebuilt on every pass by _iter_base_words)
+    processed_relations, _ = _process_people(profile.relationships, target_last, target_name_variants, date_list)
+    print(f"[+] Relations processed: {len(processed_relations)}")
 
-    # children
-    processed_children, children_words = _process_people(profile.children, target_last, target_name_variants, date_list)
-    print(f"[+] Children processed: {len(processed_children)} — children words {len(children_words)}")
-    # combos between children (without dates)
-    for c1, c2 in itertools.permutations(processed_children, 2):
-        for v1 in c1.get("name_vars", []):
-            for v2 in c2.get("name_vars", []):
-                children_words.append(v1 + v2)
+    processed_children, _ = _process_people(profile.children, target_last, target_name_variants, date_list)
+    print(f"[+] Children processed: {len(processed_children)}")
 
-    # pets
-    processed_pets, pet_words = _process_pets(profile.pets, target_name_variants, date_list)
-    print(f"[+] Pets processed: {len(processed_pets)} — pet words {len(pet_words)}")
-    pet_words += combine_pets(processed_pets)
+    processed_pets, _ = _process_pets(profile.pets, target_name_variants, date_list)
+    print(f"[+] Pets processed: {len(processed_pets)}")
+
+    return {
+        "target_name_variants": target_name_variants,
+        "important_words": important_words,
+        "date_list": date_list,
+        "relations": processed_relations,
+        "children": processed_children,
+        "pets": processed_pets
+    }
+
+
+def _iter_base_words(ctx):
+    """
+    Lazily yield every base word (before numbers/specials/leet) in priority order.
+    Each call starts a fresh pass, so the stream can be replayed without storing it.
+    """
+    for _, words in _iter_base_word_sections(ctx):
+        yield from words
+
+
+def _iter_base_word_sections(ctx):
+    """
+    The base word stream as (source, lazy iterator) sections, in priority
+    order; the source names the entities a word is built from (see
+    magicguess.scoring).
+    """
+    target_name_variants = ctx["target_name_variants"]
+    important_words = ctx["important_words"]
 
     # include initial target words
-    words = []
-    words += target_name_variants
-    words += important_words
-    words += relation_words
-    words += children_words
-    words += pet_words
-    print(f"[+] Accumulated words before combos/transforms: {len(words)}")
+    yield "target", iter(target_name_variants)
+    yield "keyword", iter(important_words)
+    for rel in ctx["relations"]:
+        yield "relation", _iter_person_words(rel)
+    for child in ctx["children"]:
+        yield "child", _iter_person_words(child)
+
+    # combos between children (without dates)
+    yield "child_combo", (v1 + v2
+                          for c1, c2 in itertools.permutations(ctx["children"], 2)
+                          for v1 in c1.get("name_vars", [])
+                          for v2 in c2.get("name_vars", []))
+
+    # pets
+    for pet in ctx["pets"]:
+        yield "pet", _iter_pet_words(pet, target_name_variants)
+    yield "pet_combo", combine_pets(ctx["pets"])
 
     # combos: target <-> important words
-    for w in important_words:
-        for tn in target_name_variants:
-            words.append(tn + w)
-            words.append(w + tn)
+    yield "target_keyword", (combo
+                             for w in important_words
+                             for tn in target_name_variants
+                             for combo in (tn + w, w + tn))
 
     # combos: target <-> relations
-    for rel in processed_relations:
-        for tn in target_name_variants:
-            for rv in rel.get("name_vars", []) + rel.get("nickname_vars", []):
-                words.append(tn + rv)
-                words.append(rv + tn)
-
-    # entity <-> date combos
+    yield "target_relation", (combo
+                              for rel in ctx["relations"]
+                              for tn in target_name_variants
+                              for rv in rel.get("name_vars", []) + rel.get("nickname_vars", [])
+                              for combo in (tn + rv, rv + tn))
+
+    # entity <-> date combos (same entity order as _collect_all_entities)
+    date_list = ctx["date_list"]
+    yield "target_date", _combine_entity_date_combos(ctx["target_name_variants"], date_list)
+    for source, group in (("relation_date", ctx["relations"]), ("child_date", ctx["children"]),
+                          ("pet_date", ctx["pets"])):
+        for entity in group:
+            yield source, _combine_entity_date_combos(entity.get("name_vars", []) + entity.get("nickname_vars", []),
+                                                      date_list)
+    yield "keyword_date", _combine_entity_date_combos(ctx["important_words"], date_list)
+
+
+def _collect_all_entities(ctx):
+    """Every name/nickname variant and important word that gets combined with dates."""
     all_entities = []
-    all_entities += target_name_variants
-    for rel in processed_relations:
+    all_entities += ctx["target_name_variants"]
+    for rel in ctx["relations"]:
         all_entities += rel.get("name_vars", []) + rel.get("nickname_vars", [])
-    for child in processed_children:
+    for child in ctx["children"]:
         all_entities += child.get("name_vars", []) + child.get("nickname_vars", [])
-    for pet in processed_pets:
+    for pet in ctx["pets"]:
         all_entities += pet.get("name_vars", []) + pet.get("nickname_vars", [])
-    all_entities += important_words
+    all_entities += ctx["important_words"]
+    return all_entities
+
+
+def _keep_candidate(w, policy=None, exclude=None):
+    """Final filter, then the password policy and the already-tried wordlists."""
+    return bool(_keep_candidates((w,), policy, exclude))
+
+
+def _keep_candidates(words, policy=None, exclude=None):
+    """The words passing _keep_candidate(), in order; one loop for a whole chunk."""
+    kept = []
+    for w in words:
+        if len(w) < MIN_WORDLIST_LENGTH:
+            continue
+        if w.isdigit():
+            continue
+        if all(c in SPECIAL_CHARS for c in w):
+            continue
+        if all_upper(w):
+            continue
+        if policy is not None and not policy.allows(w):
+            continue
+        if exclude is not None and w in exclude:
+            continue
+        kept.append(w)
+    return kept
+
+
+# -------------------------
+# Final transforms (serial or multi-process)
+# -------------------------
+TRANSFORM_CHUNK_SIZE = 2000
+
+# Passes over the base words, in output priority order:
+#   plain        : base word + special chars
+#   numbers      : base word + common number + special chars
+#   leet_plain   : leet variants of the "plain" pass
+#   leet_numbers : leet variants of the "numbers" pass
+TRANSFORM_PASSES = ("plain", "numbers")
+LEET_PASSES = ("leet_plain", "leet_numbers")
+
+
+def _leet_options(profile):
+    """(depth, map, per-word budget) of the leet passes, or None when leet is off."""
+    if not getattr(profile, "leet_enabled", False):
+        return None
+    return (getattr(profile, "leet_depth", LEET_DEPTH),
+            getattr(profile, "leet_map", None),
+            getattr(profile, "leet_word_budget", None))
+
+
+def _iter_transform_tasks(base_words, leet=None, policy=None, skip=0, limit=None, exclude=None):
+    """
+    Split the base word stream into (pass, chunk, leet options, policy,
+    exclusion index, bounds, end) tasks, in output order. `base_words` is a callable returning a fresh
+    iterator; it is replayed once per pass.
+
+    Only the blocks overlapping raw indices [skip, skip + limit) are emitted
+    (see _block_size). A block cut by a slice edge becomes a one-word task
+    with (lo, hi) bounds inside the block; `end` is the raw index right after
+    the task's last candidate.
+    """
+    stop = None if limit is None else skip + limit
+    passes = TRANSFORM_PASSES + (LEET_PASSES if leet else ())
+    position = 0
+    for stage in passes:
+        chunk = []
+        for w in base_words():
+            block_start = position
+            position += _block_size(stage, w, leet)
+            if position <= skip:
+                continue
+            if stop is not None and block_start >= stop:
+                if chunk:
+                    yield stage, chunk, leet, policy, exclude, None, block_start
+                return
+            if block_start < skip or (stop is not None and position > stop):
+                if chunk:
+                    yield stage, chunk, leet, policy, exclude, None, block_start
+                    chunk = []
+                end = position if stop is None else min(position, stop)
+                yield stage, [w], leet, policy, exclude, (max(skip, block_start) - block_start, end - block_start), end
+                continue
+            chunk.append(w)
+            if len(chunk) >= TRANSFORM_CHUNK_SIZE:
+                yield stage, chunk, leet, policy, exclude, None, position
+                chunk = []
+        if chunk:
+            yield stage, chunk, leet, policy, exclude, None, position
+
+
+# -------------------------
+# Keyspace indexing
+# -------------------------
+# Every candidate has a raw index: its position in the expansion stream before
+# filters and deduplication, pass by pass and base word by base word. The
+# candidates of one (pass, base word) block are contiguous and the block size
+# only depends on the word (leet blocks reserve the full leet count of the
+# word for each of its special-character variants), so a slice is located by
+# walking the cheap base word stream without expanding anything. Pruned,
+# filtered and duplicate candidates leave gaps; they never shift later indices.
+SPECIALS_PER_WORD = 1 + 3 * len(SPECIAL_CHARS)
+
+
+def _leet_count(word, leet):
+    """Leet variants reserved per special-character variant of a word."""
+    depth, leet_map, word_budget = leet
+    count = sum(_leet_poly(word, depth, leet_map)[1:])
+    return count if word_budget is None else min(count, max(0, word_budget))
+
+
+def _block_size(stage, word, leet=None):
+    """Number of raw indices taken by a base word in one pass."""
+    size = SPECIALS_PER_WORD
+    if stage in ("numbers", "leet_numbers"):
+        size *= len(COMMON_NUMBERS)
+    if stage in LEET_PASSES:
+        # numbers and special characters have no leet letters
+        size *= _leet_count(word, leet)
+    return size
+
+
+def _block_candidates(stage, word, leet, lo, hi):
+    """Candidates of a block at offsets [lo, hi), before filters."""
+    stems = [word] if stage in ("plain", "leet_plain") else append_common_numbers(word)
+    variants = [v for st in stems for v in special_chars_variants(st)]
+    if stage not in LEET_PASSES:
+        return variants[lo:hi]
+
+    depth, leet_map, word_budget = leet
+    per_variant = _leet_count(word, leet)
+    candidates = []
+    for i in range(lo // per_variant, (hi - 1) // per_variant + 1):
+        # fewer distinct variants than reserved slots leave a gap at the end
+        offset = i * per_variant
+        leet_variants = apply_leet(variants[i], depth, leet_map, word_budget)[1:]
+        candidates += leet_variants[max(lo - offset, 0):hi - offset]
+    return candidates
+
+
+def wordlist_keyspace(profile, ctx=None):
+    """
+    Total number of raw indices of a profile's wordlist (see _block_size),
+    i.e. the exclusive upper bound for --skip / --limit. Only base words are built.
+    """
+    if ctx is None:
+        ctx = _build_wordlist_context(profile)
+    leet = _leet_options(profile)
+    passes = TRANSFORM_PASSES + (LEET_PASSES if leet else ())
+    return sum(_block_size(stage, w, leet) for w in _iter_base_words(ctx) for stage in passes)
+
+
+# Longest suffix and character classes each expansion step can add to a word
+NUMBERS_REACH = (max(len(n) for n in COMMON_NUMBERS), frozenset(char_classes("".join(COMMON_NUMBERS))))
+SPECIALS_REACH = (2, frozenset(char_classes("".join(SPECIAL_CHARS))))
+
+
+def _leet_reach(word, leet):
+    """(length growth, character classes) leet substitution can add to a word."""
+    if not leet:
+        return 0, frozenset()
+    depth, leet_map, _ = leet
+    leet_map = LEET_MAP if leet_map is None else leet_map
+    subs = [sub for ch in set(word.lower()) for sub in leet_map.get(ch, ())]
+    if not subs:
+        return 0, frozenset()
+    return (max(len(sub) for sub in subs) - 1) * depth, frozenset(char_classes("".join(subs)))
+
+
+def _may_satisfy(policy, word, steps, leet=None):
+    """
+    Whether some expansion of the word by the given reaches (NUMBERS_REACH,
+    SPECIALS_REACH) and then leet could still satisfy the policy.
+    """
+    growth, classes = _leet_reach(word, leet)
+    for step_growth, step_classes in steps:
+        growth += step_growth
+        classes = classes | step_classes
+    return policy.may_allow(word, growth, classes)
+
+
+def _leet_pass_candidates(word, policy, leet):
+    """
+    special_chars_variants() of a word, minus the variants whose leet variants
+    can never satisfy the policy. Only the bare word lacks a special character,
+    so the class check is done once per word instead of once per variant.
+    """
+    growth, classes = _leet_reach(word, leet)
+    if not policy.may_allow(word, growth + SPECIALS_REACH[0], classes | SPECIALS_REACH[1]):
+        return []
+    variants = special_chars_variants(word)
+    if not policy.may_allow(word, growth, classes):
+        variants = variants[1:]
+    # leet never shortens a word
+    return [v for v in variants if len(v) + growth >= policy.min_length
+            and (policy.max_length is None or len(v) <= policy.max_length)]
+
+
+def _expand_chunk(task):
+    """
+    Expand one chunk of base words for one pass, before the final filter.
+    With a password policy, words are dropped at every step (base word, word
+    with number, word with special characters) as soon as none of their
+    remaining expansions can satisfy it, so they are never expanded.
+    Bounded tasks (see _iter_transform_tasks) expand only their slice of one
+    block, without pruning, so that offsets inside the block stay stable.
+    Returns (pass, number of candidates generated, candidates, raw index after
+    the task).
+    """
+    stage, words, leet, policy, exclude, bounds, end = task
+    if bounds is not None:
+        candidates = _block_candidates(stage, words[0], leet, *bounds)
+        return stage, len(candidates), candidates, end
+
+    leet_pass = stage in LEET_PASSES
+    pass_leet = leet if leet_pass else None
+    with_numbers = stage not in ("plain", "leet_plain")
+
+    if policy is not None:
+        steps = (NUMBERS_REACH, SPECIALS_REACH) if with_numbers else (SPECIALS_REACH,)
+        words = [w for w in words if _may_satisfy(policy, w, steps, pass_leet)]
+    if with_numbers:
+        stems = [n for w in words for n in append_common_numbers(w)]
+        if policy is not None:
+            stems = [n for n in stems if _may_satisfy(policy, n, (SPECIALS_REACH,), pass_leet)]
+    else:
+        stems = words
 
-    words += _combine_entity_date_combos(all_entities, date_list)
-    print(f"[+] Added date combos: total words now {len(words)}")
+    if leet_pass and policy is not None:
+        candidates = [s for w in stems for s in _leet_pass_candidates(w, policy, leet)]
+    else:
+        candidates = [s for w in stems for s in special_chars_variants(w)]
+    generated = len(candidates)
+    if leet_pass:
+        # apply_leet() returns the word itself first; it was already emitted by
+        # the matching non-leet pass, so only the substituted variants are kept
+        depth, leet_map, word_budget = leet
+        variants = [apply_leet(w, depth, leet_map, word_budget) for w in candidates]
+        generated = sum(len(v) - 1 for v in variants)
+        candidates = [lw for v in variants for lw in v[1:]]
+    return stage, generated, candidates, end
+
+
+def _transform_chunk(task):
+    """
+    _expand_chunk() followed by the final filter, for the worker processes, so
+    it only depends on its (picklable) arguments. Candidates found in the
+    exclusion index (already-tried wordlists) are dropped with the final filter.
+    The filter only looks at the word itself and dropping repeats inside the
+    chunk keeps first occurrences, so both give the same result as running
+    after the global dedup while shrinking what is sent back to the parent.
+    """
+    stage, generated, candidates, end = _expand_chunk(task)
+    policy, exclude = task[3], task[4]
+    return stage, generated, dedupe(_keep_candidates(candidates, policy, exclude)), end
+
+
+def imap_bounded(pool, func, tasks, max_pending):
+    """
+    Ordered pool.imap that never queues more than `max_pending` tasks,
+    so the base word stream is not drained into memory ahead of the workers.
+    """
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
 
-    # apply transformations and filtering
-    filtered = _apply_final_transforms(words, profile)
-    print(f"[+] Final filtered wordlist size: {len(filtered)}")
 
+def resolve_workers(profile):
+    workers = int(getattr(profile, "workers", 1) or 1)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _profile_deduper(profile):
+    """The deduplication backend chosen by the profile's dedup_* options."""
+    return make_deduper(
+        getattr(profile, "dedup_mode", "memory"),
+        fp_rate=getattr(profile, "dedup_fp_rate", DEFAULT_FP_RATE),
+        capacity=getattr(profile, "dedup_capacity", DEFAULT_CAPACITY),
+        partitions=getattr(profile, "dedup_partitions", None),
+    )
+
+
+def _iter_final_transforms(base_words, profile, counters=None):
+    """
+    Lazily apply common numbers, special characters, leet, filtering and
+    deduplication. `base_words` is a callable returning a fresh iterator over
+    the base words; it is replayed instead of keeping intermediate lists around.
+    With profile.workers > 1 the chunks are expanded in a process pool and
+    merged back in their original order before the global dedup.
+    profile.leet_budget caps the leet candidates passing the filters; the leet
+    passes come last, so reaching it ends the stream. profile.policy (see
+    magicguess.policy) prunes words during expansion and profile.exclude (see
+    magicguess.exclusion) drops already-tried candidates. profile.skip and
+    profile.limit restrict the run to a slice of raw indices; counters["position"]
+    follows the raw index of the candidates handed to the deduplicator.
+    """
+    skip = int(getattr(profile, "skip", 0) or 0)
+    counters = counters if counters is not None else {}
+    counters.setdefault("candidates", 0)
+    counters.setdefault("filtered", 0)
+    counters.setdefault("unique", 0)
+    counters.setdefault("leet", 0)
+    counters.setdefault("position", skip)
+
+    recorder = get_recorder(profile)
+    policy = getattr(profile, "policy", None)
+    exclude = getattr(profile, "exclude", None)
+    tasks = recorder.track("wordlist.base_words",
+                           _iter_transform_tasks(base_words, _leet_options(profile), policy,
+                                                 skip, getattr(profile, "limit", None), exclude),
+                           size=lambda task: len(task[1]))
+    workers = resolve_workers(profile)
+    leet_budget = getattr(profile, "leet_budget", None)
+
+    def merged(results, filtered=True):
+        # one list per chunk; the position moves once its words are consumed
+        for stage, generated, kept, end in results:
+            if stage in LEET_PASSES and leet_budget is not None:
+                kept = kept[:max(0, leet_budget - counters["leet"])]
+                counters["leet"] += len(kept)
+            counters["candidates"] += generated
+            if filtered:
+                counters["filtered"] += len(kept)
+            yield kept
+            counters["position"] = end
+            if stage in LEET_PASSES and leet_budget is not None and counters["leet"] >= leet_budget:
+                print(f"[!] Leet budget of {leet_budget} candidates reached; remaining leet variants skipped.")
+                return
+
+    deduper = _profile_deduper(profile)
+
+    def tracked(results):
+        return recorder.track("wordlist.transforms", results, size=lambda result: len(result[2]))
+
+    if workers == 1:
+        # the filter runs after the global dedup, once per unique word; leet
+        # chunks are only filtered early when the leet budget has to count them
+        def expanded(tasks):
+            for stage, generated, candidates, end in map(_expand_chunk, tasks):
+                if stage in LEET_PASSES and leet_budget is not None:
+                    candidates = dedupe(_keep_candidates(candidates, policy, exclude))
+                yield stage, generated, candidates, end
+
+        for new in deduper.unique_batches(merged(tracked(expanded(tasks)), filtered=False)):
+            kept = _keep_candidates(new, policy, exclude)
+            counters["filtered"] += len(kept)
+            counters["unique"] += len(kept)
+            yield from kept
+        return
+
+    print(f"[+] Expanding candidates with {workers} worker processes")
+    with multiprocessing.Pool(workers) as pool:
+        results = tracked(imap_bounded(pool, _transform_chunk, tasks, workers * 4))
+        for new in deduper.unique_batches(merged(results)):
+            counters["unique"] += len(new)
+            yield from new
+
+
+def iter_wordlist(profile):
+    """
+    Lazily generate the wordlist for a profile, in priority order.
+    Peak memory is bounded by the deduplication set, not by the output size.
+    With profile.skip / profile.limit only that slice of raw indices is
+    generated (see wordlist_keyspace); deduplication is per run, so separate
+    slices may repeat a candidate but never miss one. With profile.top only
+    the best scored candidates are yielded, best first (see _iter_top_wordlist);
+    otherwise profile.markov sorts the whole wordlist by likelihood, which
+    holds it in memory.
+    """
+    recorder = get_recorder(profile)
+    skip = int(getattr(profile, "skip", 0) or 0)
+    limit = getattr(profile, "limit", None)
+    print("[+] Starting wordlist generation...")
+    with recorder.stage("wordlist.context") as rec:
+        ctx = _build_wordlist_context(profile)
+        rec["items_out"] = len(_collect_all_entities(ctx))
+
+    counters = {}
+    markov = getattr(profile, "markov", None)
+    if getattr(profile, "top", None):
+        counters.update(candidates=0, unique=0)
+        with recorder.stage("wordlist.ranked") as rec:
+            yield from _iter_top_wordlist(profile, ctx, counters)
+            rec["items_in"] = counters["candidates"]
+            rec["items_out"] = counters["unique"]
+        print(f"[+] Candidates scored: {counters['candidates']}")
+        print(f"[+] Final ranked wordlist size: {counters['unique']}")
+        return
+
+    # the stream's own time is the global dedup (plus the consumer's work)
+    completed = False
+    try:
+        with recorder.stage("wordlist.stream") as rec:
+            stream = _iter_final_transforms(lambda: _iter_base_words(ctx), profile, counters)
+            if markov is not None:
+                # ranking needs the whole deduplicated wordlist in memory
+                with recorder.stage("wordlist.markov_rank") as rank_rec:
+                    stream = markov.rank(stream)
+                    rank_rec["items_out"] = len(stream)
+            yield from stream
+            rec["items_in"] = counters["filtered"]
+            rec["items_out"] = counters["unique"]
+        completed = True
+    except GeneratorExit:
+        # closed by its consumer, e.g. once every target hash is cracked: not an
+        # interruption (consumer errors are thrown in by close_stream() instead)
+        completed = True
+        raise
+    finally:
+        if not completed:
+            resume = counters.get("position", skip)
+            print(f"[!] Wordlist interrupted; resume with --skip {resume}"
+                  + (f" --limit {skip + limit - resume}" if limit is not None else ""))
+
+    print(f"[+] Candidates generated: {counters['candidates']} — "
+          f"passed filters: {counters['filtered']}")
+    if skip or limit is not None:
+        print(f"[+] Raw keyspace slice: {skip:,} to {counters['position']:,}")
+    print(f"[+] Final filtered wordlist size: {counters['unique']}")
+
+
+def close_stream(items, error=None):
+    """
+    Finish a candidate generator now, not whenever it is collected. Without
+    `error` the consumer stopped on purpose; with the consumer's exception, it
+    is raised inside the generator first, so the wordlist reports where to
+    resume. The caller re-raises its own exception.
+    """
+    if error is not None and hasattr(items, "throw"):
+        try:
+            items.throw(error)
+        except BaseException:
+            pass
+    if hasattr(items, "close"):
+        items.close()
+
+
+def _iter_top_wordlist(profile, ctx, counters):
+    """
+    Score every candidate with profile.scoring_model (see magicguess.scoring)
+    and yield the profile.top best, best first; ties keep generation order.
+    Candidates stream through a min-heap of at most `top` live entries, so
+    memory is bounded by N rather than by the keyspace. Once the heap is full,
+    base words whose best possible expansion cannot beat its minimum are
+    skipped without being expanded, and so are the leet variants of a
+    candidate that already missed it. The heap doubles as the deduplicator: a
+    repeated candidate keeps its highest score. With profile.markov the
+    candidate's Markov log10 likelihood (never positive, so the bounds hold)
+    is added, weighted by the model's "markov" weight.
+    """
+    top = int(profile.top)
+    model = getattr(profile, "scoring_model", None) or ScoringModel()
+    leet = _leet_options(profile)
+    policy = getattr(profile, "policy", None)
+    exclude = getattr(profile, "exclude", None)
+    markov = getattr(profile, "markov", None)
+    markov_weight = model.markov
+
+    stems = [("", model.number_score(None))] + [(n, model.number_score(n)) for n in COMMON_NUMBERS]
+    special_scores = [model.special_score(p, c) for p, c in SPECIAL_VARIANT_FEATURES]
+    leet_gain = 0.0
+    if leet:
+        # best score change a leet variant can get over its source
+        leet_gain = model.leet if model.leet <= 0 else model.leet * leet[0]
+    ceiling = max(s for _, s in stems) + max(special_scores) + max(0.0, leet_gain)
+
+    heap = []   # [score, -sequence, word]; word is None once superseded
+    best = {}   # word -> its live heap entry
+    seq = 0
+    pruned = 0
+
+    def offer(score, word):
+        nonlocal seq
+        if len(best) >= top and score <= heap[0][0]:
+            return
+        if not _keep_candidate(word, policy, exclude):
+            return
+        old = best.get(word)
+        if old is not None:
+            if old[0] >= score:
+                return
+            old[2] = None
+        seq += 1
+        entry = [score, -seq, word]
+        best[word] = entry
+        heapq.heappush(heap, entry)
+        while len(best) > top:
+            evicted = heapq.heappop(heap)[2]
+            if evicted is not None:
+                del best[evicted]
+        if len(heap) > 2 * top + 1024:
+            # drop superseded entries
+            heap[:] = [e for e in heap if e[2] is not None]
+            heapq.heapify(heap)
+
+    def offer_all(scored):
+        # the Markov likelihoods of a base word's variants are scored in one batch
+        counters["candidates"] += len(scored)
+        if markov is not None and len(best) >= top:
+            # only candidates that can still enter the heap are worth scoring
+            scored = [e for e in scored if e[0] > heap[0][0]]
+        if markov is not None and scored:
+            likelihoods = markov.score_many([w for _, w in scored])
+            scored = [(score + markov_weight * p, w) for (score, w), p in zip(scored, likelihoods)]
+        for score, word in scored:
+            offer(score, word)
+
+    for source, words in _iter_base_word_sections(ctx):
+        for w in words:
+            base = model.base_score(source, w)
+            if len(best) >= top and base + ceiling <= heap[0][0]:
+                pruned += 1
+                continue
+            if policy is not None and not _may_satisfy(policy, w, (NUMBERS_REACH, SPECIALS_REACH), leet):
+                continue
+            scored = [(base + number_score + special_score, variant)
+                      for number, number_score in stems
+                      for variant, special_score in zip(special_chars_variants(w + number), special_scores)]
+            offer_all(scored)
+            if not leet:
+                continue
+            depth, leet_map, word_budget = leet
+            for score, variant in scored:
+                if len(best) >= top and score + leet_gain <= heap[0][0]:
+                    continue
+                offer_all([(score + k * model.leet, lw)
+                           for k, lw in _iter_leet_levels(variant, depth, leet_map, word_budget)])
+
+    print(f"[+] Ranked candidates: kept the top {len(best):,} "
+          f"({pruned:,} base words skipped by the score bound)")
+    counters["unique"] = len(best)
+    ranked = sorted(best.values(), reverse=True)
+    best.clear()
+    heap.clear()
+    for _, _, w in ranked:
+        yield w
+
+
+def generate_wordlist(profile):
+    filtered = list(iter_wordlist(profile))
     return filtered, len(filtered)
 
 
+# -------------------------
+# Hashcat rule export
+# -------------------------
+def iter_base_candidates(profile):
+    """
+    Lazily yield the deduplicated base words of a profile, before numbers,
+    special characters and leet. Paired with build_hashcat_rules() this lets
+    the cracker do the expansion instead of MagicGuess. With a password
+    policy, base words none of whose expansions could satisfy it are skipped;
+    the policy itself is not applied to the cracker's output.
+    """
+    print("[+] Starting base candidate generation...")
+    ctx = _build_wordlist_context(profile)
+    base_words = _iter_base_words(ctx)
+    policy = getattr(profile, "policy", None)
+    if policy is not None:
+        leet = _leet_options(profile)
+        base_words = (w for w in base_words
+                      if _may_satisfy(policy, w, (NUMBERS_REACH, SPECIALS_REACH), leet))
+
+    deduper = _profile_deduper(profile)
+    count = 0
+    for w in deduper.unique(base_words):
+        count += 1
+        yield w
+
+    print(f"[+] Base candidates: {count}")
+
+
+def _hashcat_append(s):
+    return " ".join(f"${c}" for c in s)
+
+
+def _hashcat_special_rules():
+    """Rules matching special_chars_variants(), in the same order."""
+    rules = [""]
+    for c in SPECIAL_CHARS:
+        rules.append(f"^{c}")
+        rules.append(f"${c}")
+        rules.append(f"^{c} ${c}")
+    return rules
+
+
+def _hashcat_leet_rules(depth=LEET_DEPTH, leet_map=None):
+    """
+    One rule per combination of up to `depth` letter substitutions, in the
+    same likelihood order as iter_leet(). apply_leet() replaces single
+    positions, which hashcat cannot express; `sXY` replaces every occurrence
+    instead, so words with repeated letters get one fully-substituted variant.
+    Per-word and global leet budgets cannot be expressed as rules.
+    """
+    letters = list((LEET_MAP if leet_map is None else leet_map).items())
+    rules = []
+    for k in range(1, min(depth, len(letters)) + 1):
+        level = []
+        for combo in itertools.combinations(letters, k):
+            for ranks in itertools.product(*(range(len(subs)) for _, subs in combo)):
+                level.append((sum(ranks), " ".join(f"s{ch}{subs[r]} s{ch.upper()}{subs[r]}"
+                                                   for (ch, subs), r in zip(combo, ranks))))
+        level.sort(key=lambda plan: plan[0])
+        rules += [rule for _, rule in level]
+    return rules
+
+
+def build_hashcat_rules(leet_enabled=False, depth=LEET_DEPTH, leet_map=None):
+    """
+    Build hashcat rules reproducing the final transforms (common numbers,
+    special characters and, optionally, leet) on top of the base candidates.
+    Rules follow the pipeline's priority order; hashcat applies every rule to
+    each base word in turn, so the overall candidate order differs, and the
+    final length/case filters are not applied to the expanded candidates.
+    """
+    number_rules = [""] + [_hashcat_append(n) for n in COMMON_NUMBERS]
+    special_rules = _hashcat_special_rules()
+
+    rules = []
+    for nr in number_rules:
+        for sr in special_rules:
+            rules.append(" ".join(r for r in (nr, sr) if r) or ":")
+
+    if leet_enabled:
+        base_rules = list(rules)
+        leet_rules = _hashcat_leet_rules(depth, leet_map)
+        for r in base_rules:
+            for lr in leet_rules:
+                rules.append(lr if r == ":" else f"{r} {lr}")
+
+    return dedupe(rules)
+
+
+# -------------------------
+# Output size estimation
+# -------------------------
+# Sizes are tracked as leet polynomials (c0, c1, ..., c_depth): c0 is the
+# number of words and c_j the number of ways to substitute j positions, summed
+# over the words. A word's polynomial is the product of (1 + s*x) over its
+# letters, s being the letter's number of substitutes, so the polynomial of a
+# concatenation is the (truncated) product of its parts'. Dates, numbers and
+# special characters contribute 1. With depth 1 this is (count, single-position
+# substitutions).
+
+def _leet_poly(word, depth=LEET_DEPTH, leet_map=None):
+    leet_map = LEET_MAP if leet_map is None else leet_map
+    poly = [1] + [0] * depth
+    for ch in word.lower():
+        s = len(leet_map.get(ch, ()))
+        if s:
+            for j in range(depth, 0, -1):
+                poly[j] += poly[j - 1] * s
+    return poly
+
+
+def _size_stats(words, depth=LEET_DEPTH, leet_map=None):
+    stats = [0] * (depth + 1)
+    for w in words:
+        for j, c in enumerate(_leet_poly(w, depth, leet_map)):
+            stats[j] += c
+    return tuple(stats)
+
+
+def _add_stats(*stats):
+    return tuple(sum(c) for c in itertools.zip_longest(*stats, fillvalue=0)) or (0,)
+
+
+def _cross_stats(*stats):
+    """Stats of all concatenations taking one word from each list, in order."""
+    degree = max(len(s) for s in stats) - 1
+    poly = [1] + [0] * degree
+    for s in stats:
+        poly = [sum(poly[i] * s[j - i] for i in range(j + 1) if j - i < len(s)) for j in range(degree + 1)]
+    return tuple(poly)
+
+
+def _scale_stats(stats, k):
+    return tuple(c * k for c in stats)
+
+
+def _person_stats(processed, size):
+    names = size(processed["name_vars"])
+    nicknames = size(processed["nickname_vars"])
+    dates = size(processed["combo_dates"])
+    return _add_stats(names, _cross_stats(names, dates), nicknames, _cross_stats(nicknames, dates))
+
+
+def _pet_stats(processed, target, size):
+    names = size(processed["name_vars"])
+    nicknames = size(processed["nickname_vars"])
+    dates = size(processed["combo_dates"])
+    return _add_stats(
+        names, nicknames,
+        _scale_stats(_cross_stats(target, names), 2),
+        _scale_stats(_cross_stats(target, names, dates), 2),
+        _scale_stats(_cross_stats(target, nicknames), 2),
+        _scale_stats(_cross_stats(target, nicknames, dates), 2),
+    )
+
+
+def _estimate_base_words(ctx, depth=LEET_DEPTH, leet_map=None):
+    """Mirror _iter_base_words() section by section without building any word."""
+    def size(words):
+        return _size_stats(words, depth, leet_map)
+
+    target = size(ctx["target_name_variants"])
+    important = size(ctx["important_words"])
+
+    children = [_person_stats(c, size) for c in ctx["children"]]
+    children += [_cross_stats(size(c1["name_vars"]), size(c2["name_vars"]))
+                 for c1, c2 in itertools.permutations(ctx["children"], 2)]
+
+    pets = [_pet_stats(p, target, size) for p in ctx["pets"]]
+    pets += [_cross_stats(size(p1["name_vars"] + p1["nickname_vars"]),
+                          size(p2["name_vars"] + p2["nickname_vars"]))
+             for p1, p2 in itertools.permutations(ctx["pets"], 2)]
+
+    return [
+        ("Target name variants", target),
+        ("Important words", important),
+        ("Relation words", _add_stats(*(_person_stats(r, size) for r in ctx["relations"]))),
+        ("Children words", _add_stats(*children)),
+        ("Pet words", _add_stats(*pets)),
+        ("Target x important words", _scale_stats(_cross_stats(important, target), 2)),
+        ("Target x relations", _add_stats(*(
+            _scale_stats(_cross_stats(target, size(r["name_vars"] + r["nickname_vars"])), 2)
+            for r in ctx["relations"]))),
+        ("Entity x date combos", _scale_stats(_cross_stats(
+            size(_collect_all_entities(ctx)), size(ctx["date_list"])), 2)),
+    ]
+
+
+def _print_estimate(title, rows):
+    print(f"\n=== {title} ===")
+    for label, count, exact in rows:
+        print(f"  {label:<40} {'' if exact else '<= '}{count:,}")
+
+
+def estimate_wordlist(profile):
+    """
+    Compute the size of every stage of generate_wordlist() combinatorially,
+    without generating candidates. Counts before deduplication are exact;
+    leet (capped by the leet budgets) and the final (deduplicated, filtered)
+    size are upper bounds.
+    Prints a per-stage breakdown and returns it as (label, count, exact) rows.
+    """
+    ctx = _build_wordlist_context(profile)
+
+    rows = [
+        ("Date variants", len(ctx["date_list"]), True),
+        ("Relations / children / pets",
+         len(ctx["relations"]) + len(ctx["children"]) + len(ctx["pets"]), True),
+        ("Entities combined with dates", len(_collect_all_entities(ctx)), True),
+    ]
+
+    leet = _leet_options(profile)
+    depth, leet_map, word_budget = leet or (LEET_DEPTH, None, None)
+    sections = _estimate_base_words(ctx, depth, leet_map)
+    rows += [(label, stats[0], True) for label, stats in sections]
+    base = _add_stats(*(stats for _, stats in sections))
+    base_count = base[0]
+    rows.append(("Base words", base_count, True))
+
+    if getattr(profile, "export_mode", "wordlist") == "rules":
+        rows.append(("Base candidates after dedup", base_count, False))
+        rows.append(("Hashcat rules", len(build_hashcat_rules(bool(leet), depth, leet_map)), True))
+        _print_estimate("Wordlist size estimate (hashcat rules export)", rows)
+        return rows
+
+    # every stem (base word and base word + number) gets every special variant
+    stems = base_count * (1 + len(COMMON_NUMBERS))
+    candidates = stems * SPECIALS_PER_WORD
+    rows.append(("After common numbers", stems, True))
+    rows.append(("After special characters", candidates, True))
+
+    # raw indices (see _block_size): each leet pass reserves the word's full
+    # leet count per variant, so the keyspace follows from the same statistics
+    keyspace, keyspace_exact = candidates, True
+    if leet:
+        reserved = sum(base[1:])
+        if word_budget is not None:
+            # the budget caps each word separately: only a bound without walking them
+            reserved = min(reserved, base_count * max(0, word_budget))
+            keyspace_exact = False
+        keyspace += reserved * (1 + len(COMMON_NUMBERS)) * SPECIALS_PER_WORD
+
+        variants = sum(base[1:]) * (1 + len(COMMON_NUMBERS)) * SPECIALS_PER_WORD
+        if word_budget is not None:
+            variants = min(variants, candidates * word_budget)
+        if getattr(profile, "leet_budget", None) is not None:
+            variants = min(variants, profile.leet_budget)
+        rows.append(("Leet variants", variants, False))
+        candidates += variants
+
+    rows.append(("Final wordlist (after dedup and filters)", candidates, False))
+    rows.append(("Raw keyspace (--skip/--limit indices)", keyspace, keyspace_exact))
+    _print_estimate("Wordlist size estimate", rows)
+    return rows
+
+
 def _extract_pins_from_date(d):
     """Extract PIN variants from a date object."""
     if not d:
@@ -592,147 +1484,125 @@ def _extract_pins_from_date(d):
     
     return result
 
-def _collect_date_based_pins(profile, length):
-    """Collect all date-based PINs from profile, preserving priority order."""
-    pins = []
-    seen = set()
-    
-    # Helper to add pins maintaining order and avoiding duplicates
-    def add_pins(date_obj):
-        for pin in _extract_pins_from_date(date_obj):
-            if len(pin) == int(length) and pin not in seen:
-                pins.append(pin)
-                seen.add(pin)
-    
+def _profile_dates(profile):
+    """Dates used for PINs, in priority order."""
     # Priority 1: Target's birth date
-    if profile.birth:
-        add_pins(profile.birth)
-    
     # Priority 2: Important dates
-    for d in profile.important_dates:
-        add_pins(d)
-    
-    # Priority 3: Relationships' birth dates
-    for rel in profile.relationships:
-        if rel.get("birth"):
-            add_pins(rel["birth"])
-    
-    # Priority 4: Children's birth dates
-    for child in profile.children:
-        if child.get("birth"):
-            add_pins(child["birth"])
-    
-    # Priority 5: Pets' birth dates
-    for pet in profile.pets:
-        if pet.get("birth"):
-            add_pins(pet["birth"])
-    
-    return pins
+    # Priority 3-5: Relationships', children's and pets' birth dates
+    dates = [profile.birth] + list(profile.important_dates)
+    for group in (profile.relationships, profile.children, profile.pets):
+        dates.extend(p.get("birth") for p in group)
+    return [d for d in dates if d]
 
 
-def _add_t9_variants(s, length, t9_single, t9_multi):
-    """Add T9 variants from a string to the given sets."""
-    if not s:
-        return
-    from magicguess.utils import sanitize_word
-    
-    cleaned = sanitize_word(s)
-    if not cleaned:
-        return
-    
-    single = string_to_t9(cleaned)
-    multi = string_to_t9_multi(cleaned)
-    
-    if single and len(single) == int(length) and single.isdigit():
-        t9_single.add(single)
-    if multi and len(multi) == int(length) and multi.isdigit():
-        t9_multi.add(multi)
+def _date_pins_for_length(date_variants, length):
+    """Keep the date variants of the requested length, preserving priority order."""
+    n = int(length)
+    return dedupe(v for v in date_variants if len(v) == n)
+
+
+def _collect_date_based_pins(profile, length):
+    """Collect all date-based PINs from profile, preserving priority order."""
+    variants = [v for d in _profile_dates(profile) for v in _extract_pins_from_date(d)]
+    return _date_pins_for_length(variants, length)
+
+
+def _t9_strings(profile):
+    """
+    T9 conversions (single-press, multi-press) of the profile's names,
+    nicknames, keywords and email usernames.
+    """
+    sources = [profile.name] + list(profile.keywords)
+    sources += [em.split("@")[0] for em in profile.emails if em]
+    for group in (profile.relationships, profile.children, profile.pets):
+        for p in group:
+            sources += [p.get("name"), p.get("nickname")]
+
+    strings = []
+    for s in sources:
+        cleaned = sanitize_word(s) if s else ""
+        if cleaned:
+            strings.append((string_to_t9(cleaned), string_to_t9_multi(cleaned)))
+    return strings
+
+
+def _t9_pins_for_length(t9_strings, length):
+    """Split T9 conversions of the requested length into sorted single/multi lists."""
+    n = int(length)
+    t9_single = {s for s, _ in t9_strings if s and len(s) == n and s.isdigit()}
+    t9_multi = {m for _, m in t9_strings if m and len(m) == n and m.isdigit()}
+    return sorted(t9_single), sorted(t9_multi)
+
 
 def _collect_t9_pins(profile, length):
     """Collect T9-generated PINs from profile names and keywords."""
-    t9_single = set()
-    t9_multi = set()
-    
-    _add_t9_variants(profile.name, length, t9_single, t9_multi)
-    
-    for kw in profile.keywords:
-        _add_t9_variants(kw, length, t9_single, t9_multi)
-    
-    for em in profile.emails:
-        if em:
-            _add_t9_variants(em.split("@")[0], length, t9_single, t9_multi)
-    
-    for rel in profile.relationships:
-        _add_t9_variants(rel.get("name"), length, t9_single, t9_multi)
-        _add_t9_variants(rel.get("nickname"), length, t9_single, t9_multi)
-    
-    for child in profile.children:
-        _add_t9_variants(child.get("name"), length, t9_single, t9_multi)
-        _add_t9_variants(child.get("nickname"), length, t9_single, t9_multi)
-    
-    for pet in profile.pets:
-        _add_t9_variants(pet.get("name"), length, t9_single, t9_multi)
-        _add_t9_variants(pet.get("nickname"), length, t9_single, t9_multi)
-    
-    return sorted(t9_single), sorted(t9_multi)
+    return _t9_pins_for_length(_t9_strings(profile), length)
 
-def _extract_numeric_sequences(s, length):
-    """Extract all numeric sequences of specified length from a string."""
-    if not s:
-        return []
-    
-    import re
-    # Find all sequences of digits
-    numbers = re.findall(r'\d+', s)
-    
+
+def _digit_runs(s):
+    """All maximal runs of digits in a string."""
+    return re.findall(r'\d+', s) if s else []
+
+
+def _sequences_from_runs(runs, length):
+    """Every substring of the requested length of each digit run, in order."""
+    n = int(length)
     sequences = []
-    for num in numbers:
-        # If exact length match
-        if len(num) == int(length):
-            sequences.append(num)
-        # If longer, extract all possible substrings of desired length
-        elif len(num) > int(length):
-            for i in range(len(num) - int(length) + 1):
-                sequences.append(num[i:i+int(length)])
-    
+    for num in runs:
+        # exact length match, or all substrings of a longer run
+        for i in range(len(num) - n + 1):
+            sequences.append(num[i:i + n])
     return sequences
 
-def _collect_numeric_pins(profile, length):
-    """Collect numeric sequences from emails, keywords, and usernames."""
-    numeric_pins = []
-    seen = set()
-    
-    # Extract from emails (both full email and username part)
+
+def _extract_numeric_sequences(s, length):
+    """Extract all numeric sequences of specified length from a string."""
+    return _sequences_from_runs(_digit_runs(s), length)
+
+
+def _profile_digit_runs(profile):
+    """Digit runs from emails (full address and username), keywords and name, in priority order."""
+    texts = []
     for em in profile.emails:
         if em:
-            # Full email
-            for pin in _extract_numeric_sequences(em, length):
-                if pin not in seen:
-                    numeric_pins.append(pin)
-                    seen.add(pin)
-            # Username part (before @)
-            username = em.split("@")[0]
-            for pin in _extract_numeric_sequences(username, length):
-                if pin not in seen:
-                    numeric_pins.append(pin)
-                    seen.add(pin)
-    
-    # Extract from keywords
-    for kw in profile.keywords:
-        if kw:
-            for pin in _extract_numeric_sequences(kw, length):
-                if pin not in seen:
-                    numeric_pins.append(pin)
-                    seen.add(pin)
-    
-    # Extract from name (usernames often contain birth year, etc.)
-    if profile.name:
-        for pin in _extract_numeric_sequences(profile.name, length):
-            if pin not in seen:
-                numeric_pins.append(pin)
-                seen.add(pin)
-    
-    return numeric_pins
+            texts += [em, em.split("@")[0]]
+    texts += list(profile.keywords)
+    # usernames often contain birth year, etc.
+    texts.append(profile.name)
+    return [run for t in texts for run in _digit_runs(t)]
+
+
+def _collect_numeric_pins(profile, length):
+    """Collect numeric sequences from emails, keywords, and usernames."""
+    return dedupe(_sequences_from_runs(_profile_digit_runs(profile), length))
+
+
+def _collect_pin_sources(profile):
+    """
+    Length-independent PIN material of a profile: date variants, digit runs
+    and T9 conversions. Computed once and shared by every requested length.
+    """
+    return {
+        "date_variants": [v for d in _profile_dates(profile) for v in _extract_pins_from_date(d)],
+        "digit_runs": _profile_digit_runs(profile),
+        "t9_strings": _t9_strings(profile),
+    }
+
+
+def _collect_recorded_pin_sources(profile):
+    with get_recorder(profile).stage("pinlist.sources") as rec:
+        sources = _collect_pin_sources(profile)
+        rec["items_out"] = sum(len(v) for v in sources.values())
+    return sources
+
+
+def _pin_sources_for_length(sources, length):
+    """Returns (date_pins, numeric_pins, t9_single, t9_multi) for one PIN length."""
+    date_pins = _date_pins_for_length(sources["date_variants"], length)
+    numeric_pins = dedupe(_sequences_from_runs(sources["digit_runs"], length))
+    t9_single, t9_multi = _t9_pins_for_length(sources["t9_strings"], length)
+    return date_pins, numeric_pins, t9_single, t9_multi
+
 
 def _known_patterns(length):
     """Generate common/known PIN patterns."""
@@ -766,146 +1636,379 @@ def _known_patterns(length):
     return [p for p in patterns if p.isdigit() and len(p) == n]
 
 
-def _load_base_pin_file(base_file, length):
-    """Load or create base PIN file."""
+def _load_base_pin_file(base_file, length, write_missing=False):
+    """
+    Stream the base PIN file, or fall back to the virtual keyspace when it is missing.
+    Returns (entries, unique): `unique` is True when the entries are known to
+    contain no duplicates, so the caller does not need to remember them.
+    With write_missing, a missing file is also written out (e.g. for hashcat).
+    """
     if base_file.exists():
-        return _read_base_file(base_file)
-    
-    print(f"[!] Base PIN file not found: {base_file.name}.")
-    print("[!] You can create it yourself. Example command:")
-    print(f"    hashcat -a 3 {'?d'*int(length)} --stdout > {base_file.name}")
-    
-    resp = input(f"[?] Do you want MagicGuess to create {base_file.name} now? (y/N): ").strip().lower()
-    if resp not in ("y", "yes"):
-        print("[!] Skipping base file creation. Using generated PINs only.")
-        return []
-    
-    return _create_base_file(base_file, length)
+        cache_file = _ensure_base_cache(base_file, length)
+        if cache_file is not None:
+            return _iter_base_cache(cache_file, length), True
+        return _iter_base_file(base_file), False
+
+    print(f"[!] Base PIN file not found: {base_file.name}. "
+          f"Enumerating the {int(length)}-digit keyspace on the fly in frequency order.")
+    if write_missing:
+        _create_base_file(base_file, length)
+
+    return _iter_virtual_keyspace(length), True
 
 
-def _read_base_file(base_file):
-    """Read existing base PIN file with encoding detection."""
+def _iter_virtual_keyspace(length):
+    """
+    Lazily yield every PIN of the given length in frequency order: common
+    PINs, structural patterns, then the rest by digit likelihood (see
+    magicguess.pinstats). No file; memory is bounded by the pattern set.
+    """
+    return iter_frequency_pins(length)
+
+
+BASE_READ_CHUNK = 1 << 20
+ENCODING_SNIFF_BYTES = 1 << 16
+
+
+def _iter_base_file(base_file):
+    """
+    Lazily yield PINs from a base file. The file is memory-mapped and decoded
+    in 1 MB chunks with an incremental decoder, so memory use is constant and
+    the first PINs are available immediately, whatever the file size.
+    """
     try:
-        raw = base_file.read_bytes()
-        encoding = _detect_encoding(raw)
-        text = raw.decode(encoding)
-        base_list = [ln.strip() for ln in text.splitlines() if ln.strip()]
-        print(f"[+] Loaded base PIN list from {base_file.name} ({len(base_list)} entries) using encoding {encoding}")
-        return base_list
-    except Exception as e:
+        with base_file.open("rb") as fh:
+            if base_file.stat().st_size == 0:
+                print(f"[!] {base_file.name} is empty.")
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                encoding = _detect_encoding(mm[:ENCODING_SNIFF_BYTES])
+                print(f"[+] Streaming base PIN list from {base_file.name} using encoding {encoding}")
+
+                decoder = codecs.getincrementaldecoder(encoding)()
+                count = 0
+                carry = ""
+                for pos in range(0, len(mm), BASE_READ_CHUNK):
+                    lines = (carry + decoder.decode(mm[pos:pos + BASE_READ_CHUNK])).splitlines(True)
+                    # an unterminated last line continues in the next chunk
+                    carry = lines.pop() if lines and lines[-1] == lines[-1].splitlines()[0] else ""
+                    for ln in lines:
+                        ln = ln.strip()
+                        if ln:
+                            count += 1
+                            yield ln
+                carry = (carry + decoder.decode(b"", final=True)).strip()
+                if carry:
+                    count += 1
+                    yield carry
+        print(f"[+] Read {count} entries from {base_file.name}")
+    except (OSError, ValueError) as e:
         print(f"[!] Failed to read {base_file.name}: {e}")
-        return []
 
 
 def _detect_encoding(raw):
-    """Detect file encoding from BOM or by trying common encodings."""
+    """Detect file encoding from BOM, NUL byte layout or a trial decode of a prefix."""
     if raw.startswith(b"\xef\xbb\xbf"):
         return "utf-8-sig"
     elif raw.startswith(b"\xff\xfe"):
         return "utf-16"
     elif raw.startswith(b"\xfe\xff"):
         return "utf-16-be"
-    
-    for encoding in ["utf-8", "utf-16", "latin-1"]:
+
+    # BOM-less UTF-16: digits and newlines leave every other byte NUL
+    if raw[1::2].count(0) > len(raw) // 4:
+        return "utf-16-le"
+    if raw[0::2].count(0) > len(raw) // 4:
+        return "utf-16-be"
+
+    try:
+        # the prefix may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(raw, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+# -------------------------
+# Binary cache for base PIN files
+# -------------------------
+# Sidecar file next to the text list, e.g. PIN4_markov.txt.mgcache:
+#   header (magic, version, typecode, byte order, length, count, source size, source mtime)
+#   followed by the valid, deduplicated PINs in file order as a packed array.
+BASE_CACHE_SUFFIX = ".mgcache"
+BASE_CACHE_MAGIC = b"MGPC"
+BASE_CACHE_VERSION = 1
+BASE_CACHE_HEADER = struct.Struct("<4sBccBQQq")
+BASE_CACHE_BATCH = 1 << 20
+
+
+def _base_cache_typecode(length):
+    # 'I' holds every PIN up to 9 digits, longer ones need 64 bits
+    return "I" if int(length) <= 9 else "Q"
+
+
+def _base_cache_path(base_file):
+    return base_file.with_name(base_file.name + BASE_CACHE_SUFFIX)
+
+
+def _read_base_cache_header(cache_file, base_file, length):
+    """Return the entry count of a valid, up-to-date cache, or None."""
+    try:
+        stat = base_file.stat()
+        with cache_file.open("rb") as fh:
+            header = fh.read(BASE_CACHE_HEADER.size)
+        cache_size = cache_file.stat().st_size
+    except OSError:
+        return None
+    if len(header) != BASE_CACHE_HEADER.size:
+        return None
+
+    magic, version, typecode, byteorder, n, count, size, mtime_ns = BASE_CACHE_HEADER.unpack(header)
+    typecode = typecode.decode("ascii", "replace")
+    itemsize = array.array(_base_cache_typecode(length)).itemsize
+    if (magic != BASE_CACHE_MAGIC or version != BASE_CACHE_VERSION
+            or typecode != _base_cache_typecode(length) or byteorder != sys.byteorder[0].encode()
+            or n != int(length) or size != stat.st_size or mtime_ns != stat.st_mtime_ns
+            or cache_size != BASE_CACHE_HEADER.size + count * itemsize):
+        return None
+    return count
+
+
+def _build_base_cache(base_file, cache_file, length):
+    """
+    Parse the text base file once and write its valid, unique PINs as a packed array.
+    The cache is written to a temporary file and renamed, so readers never see a partial one.
+    """
+    n = int(length)
+    typecode = _base_cache_typecode(length)
+    stat = base_file.stat()
+    tmp_file = cache_file.with_name(cache_file.name + f".{os.getpid()}.tmp")
+    print(f"[+] Building binary cache {cache_file.name}...")
+
+    seen = PinBitmap(length)
+    count = 0
+    try:
+        with tmp_file.open("wb") as fh:
+            fh.write(bytes(BASE_CACHE_HEADER.size))
+            batch = array.array(typecode)
+            for p in _iter_base_file(base_file):
+                if p.isdigit() and len(p) == n and not seen.add(p):
+                    batch.append(int(p))
+                    if len(batch) >= BASE_CACHE_BATCH:
+                        batch.tofile(fh)
+                        count += len(batch)
+                        batch = array.array(typecode)
+            batch.tofile(fh)
+            count += len(batch)
+
+            fh.seek(0)
+            fh.write(BASE_CACHE_HEADER.pack(
+                BASE_CACHE_MAGIC, BASE_CACHE_VERSION, typecode.encode("ascii"), sys.byteorder[0].encode(),
+                n, count, stat.st_size, stat.st_mtime_ns))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[!] Could not write {cache_file.name}: {e}")
         try:
-            raw.decode(encoding)
-            return encoding
-        except Exception:
-            continue
-    return "latin-1"
+            tmp_file.unlink()
+        except OSError:
+            pass
+        return False
+
+    print(f"[+] Cached {count:,} PINs in {cache_file.name}")
+    return True
+
+
+def _ensure_base_cache(base_file, length):
+    """
+    Return the path of an up-to-date binary cache for the base file, building
+    it if it is missing or stale (size or mtime changed). Returns None when the
+    cache cannot be written, in which case the text file is streamed instead.
+    """
+    cache_file = _base_cache_path(base_file)
+    if _read_base_cache_header(cache_file, base_file, length) is not None:
+        return cache_file
+    if _build_base_cache(base_file, cache_file, length):
+        return cache_file
+    return None
+
+
+def _iter_base_cache(cache_file, length):
+    """Lazily yield the cached PINs. The array is memory-mapped, not read."""
+    n = int(length)
+    typecode = _base_cache_typecode(length)
+    with cache_file.open("rb") as fh:
+        if cache_file.stat().st_size == BASE_CACHE_HEADER.size:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as buf, buf[BASE_CACHE_HEADER.size:] as body, body.cast(typecode) as pins:
+                print(f"[+] Loaded base PIN list from {cache_file.name} ({len(pins):,} entries)")
+                yield from map(f"%0{n}d".__mod__, pins)
 
 
 def _create_base_file(base_file, length):
-    """Create new base PIN file."""
+    """Write the virtual (frequency-ordered) keyspace to a base PIN file, in batches."""
     total = 10 ** int(length)
-    WARN_LIMIT = 2_000_000
-    
-    if total > WARN_LIMIT:
-        confirm = input(f"[!] This will create {total:,} lines (large file). Continue? (y/N): ").strip().lower()
-        if confirm not in ("y", "yes"):
-            print("[!] Skipping automatic creation. Using generated PINs only.")
-            return []
-    
     print(f"[+] Creating {base_file.name} with {total:,} entries...")
+
+    batch = []
+    written = 0
     with base_file.open("w", encoding="utf-8") as fh:
-        for i in range(total):
-            fh.write(str(i).zfill(int(length)) + "\n")
-            if i > 0 and i % 1000000 == 0:
-                print(f"  wrote {i:,} lines...")
-    
+        for pin in _iter_virtual_keyspace(length):
+            batch.append(pin)
+            if len(batch) >= 1_000_000:
+                fh.write("\n".join(batch) + "\n")
+                written += len(batch)
+                batch = []
+                print(f"  wrote {written:,} lines...")
+        if batch:
+            fh.write("\n".join(batch) + "\n")
+
     print(f"[+] Created {base_file.name}")
-    with base_file.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
 
 
-def _build_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length):
-    """Build final PIN list with priority ordering."""
-    final = []
-    seen = set()
-    
+def _iter_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length, base_unique=False):
+    """
+    Lazily yield the final PIN list with priority ordering.
+    Emitted PINs are tracked in a PinBitmap (one bit per possible PIN), which
+    keeps 8-10 digit keyspaces in memory. When `base_unique` is set (virtual
+    keyspace) base entries are only checked against the few priority PINs.
+    """
+    seen = PinBitmap(length)
+    priority = set()
+
     # 1. Date-based PINs (highest priority)
-    for p in date_pins:
-        if p not in seen:
-            final.append(p)
-            seen.add(p)
-    
     # 2. Numeric sequences from emails/keywords
-    for p in numeric_pins:
-        if p not in seen:
-            final.append(p)
-            seen.add(p)
-    
     # 3. T9 single-press PINs
-    for p in t9_single:
-        if p not in seen:
-            final.append(p)
-            seen.add(p)
-    
     # 4. T9 multi-press PINs
-    for p in t9_multi:
-        if p not in seen:
-            final.append(p)
-            seen.add(p)
-    
     # 5. Known patterns
-    for p in _known_patterns(length):
-        if p not in seen:
-            final.append(p)
-            seen.add(p)
-    
+    for source in (date_pins, numeric_pins, t9_single, t9_multi, _known_patterns(length)):
+        for p in source:
+            if not seen.add(p):
+                priority.add(p)
+                yield p
+
     # 6. Base list entries
+    if base_unique:
+        # virtual keyspace: already valid and unique, only skip the priority PINs
+        yield from itertools.filterfalse(priority.__contains__, base_list)
+        return
+
+    n = int(length)
     for p in base_list:
-        if p.isdigit() and len(p) == int(length) and p not in seen:
-            final.append(p)
-            seen.add(p)
-    
-    return final
+        if p.isdigit() and len(p) == n and not seen.add(p):
+            yield p
 
 
-def generate_pinlist(profile, length=4):
+def _build_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length):
+    """Build final PIN list with priority ordering."""
+    return list(_iter_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length))
+
+
+# largest base PIN keyspace ranked with --markov (the list is sorted in memory)
+MARKOV_PIN_RANK_LIMIT = 10 ** 7
+
+
+def iter_pinlist(profile, length=4, sources=None):
     """
-    Generate PIN list from profile information.
-    Returns the PIN list and its count.
+    Lazily generate the PIN list for a profile, in priority order.
+    `sources` (from _collect_pin_sources) lets several lengths share one profile scan.
     """
-    # Collect date-based PINs
-    date_pins = _collect_date_based_pins(profile, length)
-    
-    # Collect numeric sequences from emails/keywords
-    numeric_pins = _collect_numeric_pins(profile, length)
-    
-    # Collect T9-generated PINs
-    t9_single, t9_multi = _collect_t9_pins(profile, length)
-    
-    # Load or create base PIN file
-    base_file = Path(__file__).parent / f"PIN{length}_markov.txt"
-    base_list = _load_base_pin_file(base_file, length)
-    
-    # Build final list with priority
-    final = _build_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length)
-    
+    recorder = get_recorder(profile)
+    if sources is None:
+        sources = _collect_recorded_pin_sources(profile)
+
+    # Date-based PINs, numeric sequences from emails/keywords and T9-generated PINs
+    date_pins, numeric_pins, t9_single, t9_multi = _pin_sources_for_length(sources, length)
+
+    # Load the base PIN file, or enumerate the keyspace on the fly
+    with recorder.stage(f"pinlist[{length}].base_load"):
+        base_file = Path(__file__).parent / f"PIN{length}_markov.txt"
+        base_list, base_unique = _load_base_pin_file(base_file, length, getattr(profile, "write_base_file", False))
+
+    markov = getattr(profile, "markov", None)
+    if markov is not None:
+        if 10 ** int(length) > MARKOV_PIN_RANK_LIMIT:
+            print(f"[!] {int(length)}-digit base PIN list too large to rank by Markov likelihood; "
+                  f"keeping its file order.")
+        else:
+            with recorder.stage(f"pinlist[{length}].markov_rank") as rec:
+                base_list = markov.rank(base_list)
+                rec["items_out"] = len(base_list)
+
+    # Stream final list with priority
+    count = 0
+    priority = len(date_pins) + len(numeric_pins) + len(t9_single) + len(t9_multi)
+    with recorder.stage(f"pinlist[{length}].stream", items_in=priority) as rec:
+        for p in _iter_final_pinlist(date_pins, numeric_pins, t9_single, t9_multi, base_list, length, base_unique):
+            count += 1
+            yield p
+        rec["items_out"] = count
+
     print(f"[+] Generated {len(date_pins)} date-based PINs; "
           f"{len(numeric_pins)} numeric sequences; "
           f"T9(single) {len(t9_single)}; T9(multi) {len(t9_multi)}; "
-          f"final PINlist length: {len(final)}")
-    
+          f"final PINlist length: {count}")
+
+
+def generate_pinlist(profile, length=4):
+    """
+    Generate PIN list from profile information.
+    Returns the PIN list and its count.
+    """
+    final = list(iter_pinlist(profile, length))
     return final, len(final)
+
+
+def iter_pinlists(profile, lengths):
+    """
+    Lazily generate PIN lists for several lengths in one pass over the profile:
+    dates, digit runs and T9 conversions are extracted once and fanned out.
+    Yields (length, PIN iterator) pairs; consume each iterator before the next.
+    """
+    sources = _collect_recorded_pin_sources(profile)
+    for length in dedupe(int(n) for n in lengths):
+        yield length, iter_pinlist(profile, length, sources)
+
+
+def generate_pinlists(profile, lengths):
+    """
+    Generate PIN lists for several lengths.
+    Returns a dict mapping each length to its PIN list.
+    """
+    return {length: list(pins) for length, pins in iter_pinlists(profile, lengths)}
+
+
+def estimate_pinlist(profile, length=4, sources=None):
+    """
+    Compute the size of every stage of generate_pinlist() without loading or
+    creating the base PIN file. Profile-derived stages are exact; the final
+    size is bounded by the keyspace (10^length).
+    Prints a per-stage breakdown and returns it as (label, count, exact) rows.
+    """
+    if sources is None:
+        sources = _collect_pin_sources(profile)
+    date_pins, numeric_pins, t9_single, t9_multi = _pin_sources_for_length(sources, length)
+    patterns = _known_patterns(length)
+    keyspace = 10 ** int(length)
+
+    priority = len(dedupe(date_pins + numeric_pins + t9_single + t9_multi + patterns))
+    base_file = Path(__file__).parent / f"PIN{length}_markov.txt"
+
+    rows = [
+        ("Date-based PINs", len(date_pins), True),
+        ("Numeric sequences", len(numeric_pins), True),
+        ("T9 single-press", len(t9_single), True),
+        ("T9 multi-press", len(t9_multi), True),
+        ("Known patterns", len(patterns), True),
+        ("Priority PINs (deduplicated)", priority, True),
+        (f"Base list ({base_file.name if base_file.exists() else 'virtual keyspace'})", keyspace, False),
+        ("Final PIN list", keyspace, False),
+    ]
+    _print_estimate(f"PIN list size estimate ({length} digits)", rows)
+    return rows
+
+
+def estimate_pinlists(profile, lengths):
+    """Estimate several PIN lengths, scanning the profile once. Returns {length: rows}."""
+    sources = _collect_pin_sources(profile)
+    return {length: estimate_pinlist(profile, length, sources) for length in dedupe(int(n) for n in lengths)}
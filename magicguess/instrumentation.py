@@ -0,0 +1,176 @@
+# instrumentation.py
+
+# Per-stage timing and memory instrumentation for MagicGuess
+#
+# A StageRecorder is attached to a profile (profile.recorder) and the
+# generators record their stages on it:
+#
+#   with recorder.stage("wordlist.context") as rec:   eager block
+#       ...
+#       rec["items_out"] = n
+#
+#   for chunk in recorder.track("wordlist.transforms", chunks):   lazy stream
+#       ...
+#
+# Each stage records wall time, CPU time, items in/out and the process peak
+# RSS when it ended. report() returns everything as a JSON-serialisable dict.
+
+import contextlib
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+from magicguess.utils import variant_cache_stats
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_VERSION = 1
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process so far, or None where unsupported.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageRecorder:
+    """
+    Collects per-stage measurements for one run (one or more profiles).
+
+    Stages opened inside another stage record its id as their parent, so the
+    report shows both inclusive time and the time spent in the stage itself.
+    Streamed stages (track) are only timed while producing items; spans
+    (stage) also include the time a consumer spends between items.
+    """
+    def __init__(self):
+        self.stages = []
+        self.profile = None
+        self.started = datetime.now()
+        self._open = []
+
+    def _new(self, name, items_in=None):
+        rec = {
+            "id": len(self.stages),
+            "name": name,
+            "profile": self.profile,
+            "parent": self._open[-1]["id"] if self._open else None,
+            "wall_s": 0.0,
+            "cpu_s": 0.0,
+            "items_in": items_in,
+            "items_out": 0,
+            "peak_rss_bytes": None,
+        }
+        self.stages.append(rec)
+        return rec
+
+    @contextlib.contextmanager
+    def stage(self, name, items_in=None):
+        """
+        Time a block. Yields the stage record so the block can set
+        "items_in"/"items_out".
+        """
+        rec = self._new(name, items_in)
+        self._open.append(rec)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec["wall_s"] += time.perf_counter() - wall
+            rec["cpu_s"] += time.process_time() - cpu
+            rec["peak_rss_bytes"] = peak_rss_bytes()
+            self._open.remove(rec)
+
+    def track(self, name, iterable, size=None, items_in=None):
+        """
+        Wrap an iterable and time only the calls that produce its items.
+        `size(item)` counts items made of several entries (e.g. chunks).
+        Meant for coarse streams: every item costs four clock reads.
+        """
+        rec = self._new(name, items_in)
+        return self._tracked(rec, iter(iterable), size)
+
+    def _tracked(self, rec, it, size):
+        perf, cpu_time = time.perf_counter, time.process_time
+        # a stream belongs to the stage that first pulls from it
+        rec["parent"] = self._open[-1]["id"] if self._open else None
+        try:
+            while True:
+                self._open.append(rec)
+                wall, cpu = perf(), cpu_time()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    rec["wall_s"] += perf() - wall
+                    rec["cpu_s"] += cpu_time() - cpu
+                    self._open.remove(rec)
+                rec["items_out"] += size(item) if size else 1
+                yield item
+        finally:
+            rec["peak_rss_bytes"] = peak_rss_bytes()
+
+    def report(self):
+        """
+        Return the measurements as a dict. "self_wall_s" is the stage's wall
+        time minus the wall time of the stages nested in it.
+        """
+        stages = []
+        for rec in self.stages:
+            entry = dict(rec)
+            children = sum(r["wall_s"] for r in self.stages if r["parent"] == rec["id"])
+            entry["self_wall_s"] = max(0.0, rec["wall_s"] - children)
+            entry["items_per_s"] = rec["items_out"] / rec["wall_s"] if rec["wall_s"] else None
+            stages.append(entry)
+
+        top = [r for r in self.stages if r["parent"] is None]
+        return {
+            "version": REPORT_VERSION,
+            "started": self.started.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": stages,
+            "variant_caches": variant_cache_stats(),
+            "total": {
+                "wall_s": sum(r["wall_s"] for r in top),
+                "cpu_s": sum(r["cpu_s"] for r in top),
+                "peak_rss_bytes": peak_rss_bytes(),
+            },
+        }
+
+    def save(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"[+] Instrumentation report saved to {filename}")
+
+
+class NullRecorder:
+    """
+    Recorder used when instrumentation is off: same interface, no overhead.
+    """
+    profile = None
+
+    @contextlib.contextmanager
+    def stage(self, name, items_in=None):
+        yield {}
+
+    def track(self, name, iterable, size=None, items_in=None):
+        return iterable
+
+
+NULL_RECORDER = NullRecorder()
+
+
+def get_recorder(profile):
+    """Return the profile's recorder, or a no-op one."""
+    return getattr(profile, "recorder", None) or NULL_RECORDER
@@ -1,24 +1,598 @@
 # io_handlers.py
 
-# Input/output handlers for MagicGuess 
+# Input/output handlers for MagicGuess
 
-def save_wordlist(wordlist, filename="AwesomeWordlist.txt"):
+import bz2
+import contextlib
+import gzip
+import hashlib
+import heapq
+import json
+import lzma
+import os
+import queue
+import stat
+import sys
+import threading
+
+from magicguess.core import MasterGuess
+from magicguess.crack import HASH_LENGTHS, detect_hash_type
+from magicguess.policy import PasswordPolicy
+from magicguess.scoring import ScoringModel
+from magicguess.utils import parse_date, validate_email
+
+# compression name -> (file extension, opener)
+COMPRESSIONS = {
+    "gz": (".gz", gzip.open),
+    "bz2": (".bz2", bz2.open),
+    "xz": (".xz", lzma.open),
+}
+WRITE_BATCH_SIZE = 50_000
+WRITE_QUEUE_DEPTH = 8
+# streams feed a cracker as candidates are produced: small batches, flushed at once
+STREAM_BATCH_SIZE = 1_000
+STDOUT = "-"
+SHARD_MODES = ("round-robin", "balanced")
+
+
+def resolve_output(filename, compression=None):
     """
-    Saves the generated wordlist to a file.
+    Return (filename, compression) for an output file.
+    The compression is taken from the argument or inferred from the extension;
+    when given explicitly, its extension is appended if missing.
     """
-    with open(filename, "w", encoding="utf-8") as f:
-        for w in wordlist:
-            f.write(w + "\n")
+    if compression in (None, "", "none"):
+        for name, (ext, _) in COMPRESSIONS.items():
+            if filename.endswith(ext):
+                return filename, name
+        return filename, None
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression!r} (expected one of {', '.join(COMPRESSIONS)})")
+    ext = COMPRESSIONS[compression][0]
+    if not filename.endswith(ext):
+        filename += ext
+    return filename, compression
+
+
+class _ChecksumFile:
+    """Write-only file wrapper counting and hashing the bytes that reach the disk."""
+    def __init__(self, fh):
+        self._fh = fh
+        self.name = fh.name
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._fh.write(data)
+
+    def flush(self):
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class WordlistWriter:
+    """
+    Output sink for candidate streams.
+
+    Lines are joined and encoded in batches of `batch_size`, and the encoded
+    batches are written (and compressed) by a background thread, so generation
+    keeps running while the previous batch hits the disk. gzip/bz2/xz release
+    the GIL while compressing, so compression overlaps generation as well.
+
+    With `fileobj` (stdout or a FIFO, see open_output_stream) the lines go to
+    that already-open binary stream instead: every batch is flushed as soon as
+    it is written and the stream is left open on close().
+
+    With `checksum`, the size and SHA-256 of the bytes written to the file
+    (after compression) are available as `bytes` and `sha256` after close().
+    """
+    def __init__(self, filename, compression=None, batch_size=WRITE_BATCH_SIZE, fileobj=None,
+                 checksum=False):
+        if fileobj is None:
+            self.filename, self.compression = resolve_output(filename, compression)
+        else:
+            self.filename, self.compression = filename, None
+        self.batch_size = batch_size
+        self.count = 0
+        self._fileobj = fileobj
+        self._checksum = checksum
+        self.bytes = None
+        self.sha256 = None
+        self._raw = None
+        self._fh = None
+        self._queue = None
+        self._thread = None
+        self._error = None
+
+    def open(self):
+        if self._fileobj is not None:
+            self._fh = self._fileobj
+        else:
+            self._raw = open(self.filename, "wb")
+            if self._checksum:
+                self._raw = _ChecksumFile(self._raw)
+            # the compressor writes through the raw file, so checksums cover the compressed bytes
+            self._fh = COMPRESSIONS[self.compression][1](self._raw, "wb") if self.compression else self._raw
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+        return self
+
+    def _drain(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is None:
+                try:
+                    self._fh.write(chunk)
+                    if self._fileobj is not None:
+                        self._fh.flush()
+                except Exception as e:
+                    # keep draining so the producer never blocks; re-raised on close()
+                    self._error = e
+
+    def _put(self, lines):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def write_batch(self, lines):
+        """Queue a list of candidates for writing."""
+        self._put(lines)
+        self.count += len(lines)
+
+    def write_all(self, items):
+        """
+        Consume an iterable of candidates. Returns the number of lines written by this call.
+        """
+        start = self.count
+        batch = []
+        for w in items:
+            batch.append(w)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+        return self.count - start
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._fh is not None:
+            fh, raw = self._fh, self._raw
+            self._fh = None
+            self._raw = None
+            if self._fileobj is None:
+                try:
+                    fh.close()
+                finally:
+                    # a failing compressor trailer (e.g. disk full) must not leak the file
+                    if raw is not fh:
+                        raw.close()
+                if self._checksum:
+                    self.bytes, self.sha256 = raw.bytes, raw.sha256.hexdigest()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ShardedWriter:
+    """
+    Output sink splitting one candidate stream into `shards` files, written
+    concurrently by one WordlistWriter (and background thread) per shard.
+
+    "round-robin" deals lines out in turn; "balanced" sends every line to the
+    shard with the fewest bytes so far, which evens out file sizes when line
+    lengths drift along the stream. close() writes a JSON manifest with the
+    lines, size and SHA-256 of every shard.
+    """
+    def __init__(self, filename, shards, compression=None, mode="round-robin",
+                 batch_size=WRITE_BATCH_SIZE):
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode: {mode!r} (expected one of {', '.join(SHARD_MODES)})")
+        if int(shards) < 1:
+            raise ValueError(f"The number of shards must be at least 1, got {shards}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.filename, self.compression = resolve_output(filename, compression)
+        plain = self.filename
+        if self.compression:
+            plain = plain[:-len(COMPRESSIONS[self.compression][0])]
+        root, ext = os.path.splitext(plain)
+        self.manifest = f"{root}.manifest.json"
+        # shard files get the compression extension back from their own writer
+        self.writers = [WordlistWriter(f"{root}_shard{i:03d}{ext}", self.compression, batch_size, checksum=True)
+                        for i in range(1, int(shards) + 1)]
+        self.count = 0
+
+    def open(self):
+        try:
+            for writer in self.writers:
+                writer.open()
+        except OSError:
+            for writer in self.writers:
+                writer.close()
+            raise
+        return self
+
+    def write_all(self, items):
+        """Consume an iterable of candidates. Returns the number of lines written by this call."""
+        n = len(self.writers)
+        batches = [[] for _ in range(n)]
+        written = 0
+        if self.mode == "round-robin":
+            for i, w in enumerate(items):
+                batch = batches[i % n]
+                batch.append(w)
+                if len(batch) >= self.batch_size:
+                    self.writers[i % n].write_batch(batch)
+                    batches[i % n] = []
+                written = i + 1
+        else:
+            # (bytes so far, shard): the least-filled shard is always on top
+            sizes = [(0, i) for i in range(n)]
+            for w in items:
+                size, i = sizes[0]
+                heapq.heapreplace(sizes, (size + len(w) + 1, i))
+                batches[i].append(w)
+                if len(batches[i]) >= self.batch_size:
+                    self.writers[i].write_batch(batches[i])
+                    batches[i] = []
+                written += 1
+        for writer, batch in zip(self.writers, batches):
+            if batch:
+                writer.write_batch(batch)
+        self.count += written
+        return written
+
+    def close(self, write_manifest=True):
+        error = None
+        for writer in self.writers:
+            try:
+                writer.close()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        if not write_manifest:
+            return
+
+        manifest = {
+            "source": self.filename,
+            "mode": self.mode,
+            "compression": self.compression,
+            "lines": self.count,
+            "shards": [{"file": w.filename, "lines": w.count, "bytes": w.bytes, "sha256": w.sha256}
+                       for w in self.writers],
+        }
+        with open(self.manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        # an interrupted run leaves the shards but no manifest vouching for them
+        self.close(write_manifest=exc_type is None)
+
+
+def _open_writer(filename, compression=None, shards=1, shard_mode="round-robin"):
+    if shards and int(shards) > 1:
+        return ShardedWriter(filename, shards, compression, shard_mode)
+    return WordlistWriter(filename, compression)
+
+
+def _report_saved(label, writer):
+    if isinstance(writer, ShardedWriter):
+        print(f"[+] {label} saved to {len(writer.writers)} shards, manifest {writer.manifest}")
+    else:
+        print(f"[+] {label} saved to {writer.filename}")
+
+
+def save_wordlist(wordlist, filename="AwesomeWordlist.txt", compression=None, shards=1,
+                  shard_mode="round-robin"):
+    """
+    Saves the generated wordlist to a file, or to `shards` files plus a
+    manifest (see ShardedWriter).
+    Accepts any iterable (lists or lazy generators) and returns the number of lines written.
+    """
+    with _open_writer(filename, compression, shards, shard_mode) as writer:
+        writer.write_all(wordlist)
+
+    _report_saved("Wordlist", writer)
+    return writer.count
+
+
+def stream_candidates(items, stream):
+    """
+    Write candidates to an open output stream (see open_output_stream) as they
+    are produced. Returns the number of lines written. A reader that goes away
+    (e.g. hashcat exiting) raises BrokenPipeError.
+    """
+    name = getattr(stream, "name", "stream")
+    with WordlistWriter(name, batch_size=STREAM_BATCH_SIZE, fileobj=stream) as writer:
+        writer.write_all(items)
+    return writer.count
 
-    print(f"[+] Wordlist saved to {filename}")
 
+@contextlib.contextmanager
+def open_output_stream(target):
+    """
+    Open the binary stream candidates are piped to: standard output for "-",
+    otherwise a named pipe (FIFO), created if missing and removed afterwards.
+    Opening a FIFO waits until a reader (e.g. hashcat) opens the other end.
+    """
+    if target == STDOUT:
+        yield sys.stdout.buffer
+        return
+
+    created = False
+    if not os.path.exists(target):
+        os.mkfifo(target)
+        created = True
+    elif not stat.S_ISFIFO(os.stat(target).st_mode):
+        raise ValueError(f"{target} exists and is not a named pipe")
+
+    print(f"[+] Waiting for a reader on {target}...", file=sys.stderr)
+    try:
+        with open(target, "wb") as fh:
+            yield fh
+    finally:
+        if created:
+            os.unlink(target)
 
-def save_pinlist(pinlist, filename="AwesomePINlist.txt"):
+
+def save_rules(rules, filename="AwesomeWordlist.rule"):
     """
-    Saves the generated PIN list to a file.
+    Saves hashcat rules to a plain-text .rule file (hashcat cannot read compressed rules).
+    Returns the number of rules written.
     """
     with open(filename, "w", encoding="utf-8") as f:
-        for p in pinlist:
-            f.write(p + "\n")
+        f.writelines(r + "\n" for r in rules)
+        count = len(rules)
+
+    print(f"[+] Hashcat rules saved to {filename}")
+    return count
+
+
+def save_pinlist(pinlist, filename="AwesomePINlist.txt", compression=None, shards=1,
+                 shard_mode="round-robin"):
+    """
+    Saves the generated PIN list to a file, or to `shards` files plus a manifest.
+    Accepts any iterable and returns the number of lines written.
+    """
+    with _open_writer(filename, compression, shards, shard_mode) as writer:
+        writer.write_all(pinlist)
+
+    _report_saved("PIN list", writer)
+    return writer.count
+
+
+# -------------------------
+# Leet maps
+# -------------------------
+def load_leet_map(source):
+    """
+    Load a leet map: a dict or the path of a JSON object mapping single
+    letters to a substitute or a list of substitutes, most likely first,
+    e.g. {"a": ["4", "@"], "e": "3", "t": ["7", "+"]}.
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            source = json.load(f)
+    if not isinstance(source, dict):
+        raise ValueError("A leet map must be a JSON object")
+
+    leet_map = {}
+    for letter, subs in source.items():
+        if not (isinstance(letter, str) and len(letter) == 1 and letter.isalpha()):
+            raise ValueError(f"Leet map keys must be single letters, got {letter!r}")
+        subs = [subs] if isinstance(subs, str) else subs
+        if not isinstance(subs, list) or not all(isinstance(s, str) and s for s in subs):
+            raise ValueError(f"Leet map entry {letter!r} must be a string or a list of strings")
+        leet_map.setdefault(letter.lower(), [])
+        leet_map[letter.lower()] += [s for s in subs if s not in leet_map[letter.lower()]]
+    return leet_map
+
+
+# -------------------------
+# Password policies
+# -------------------------
+def load_policy(source):
+    """
+    Load a password policy: a dict or the path of a JSON object with any of
+    "min_length", "max_length", "require" (character classes among lower,
+    upper, digit, special) and "forbid" (regular expressions), e.g.
+    {"min_length": 10, "require": ["digit", "special"], "forbid": ["^[0-9]"]}.
+    """
+    if isinstance(source, PasswordPolicy):
+        return source
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            source = json.load(f)
+    return PasswordPolicy.from_dict(source)
+
+
+# -------------------------
+# Scoring models (--top)
+# -------------------------
+def load_scoring_model(source):
+    """
+    Load a scoring model: a dict or the path of a JSON object overriding any
+    of the weights in magicguess.scoring.DEFAULT_WEIGHTS, e.g.
+    {"source": {"pet_date": 0}, "number": {"123": 0}, "leet": -2}.
+    """
+    if isinstance(source, ScoringModel):
+        return source
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            source = json.load(f)
+    return ScoringModel.from_dict(source)
+
 
-    print(f"[+] PIN list saved to {filename}")
\ No newline at end of file
+# -------------------------
+# Target hashes (crack mode)
+# -------------------------
+def load_hashes(path, hash_type=None):
+    """
+    Load target hashes: one hex digest per line, optionally after labels
+    separated by colons ("user:hash", pwdump "user:rid:lm:nt:::" lines use
+    the last field). Without `hash_type` it is inferred from the first digest.
+    Returns (hash type, set of lowercase digests).
+    """
+    targets = set()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for lineno, line in enumerate(f, 1):
+            fields = [x for x in line.strip().split(":") if x]
+            if not fields:
+                continue
+            digest = fields[-1].lower()
+            if hash_type in (None, "", "auto"):
+                hash_type = detect_hash_type(digest)
+            if len(digest) != HASH_LENGTHS[hash_type] or any(c not in "0123456789abcdef" for c in digest):
+                print(f"Warning: {path}:{lineno} ignored (not a {hash_type} hash).")
+                continue
+            targets.add(digest)
+    if not targets:
+        raise ValueError(f"No hashes found in {path}")
+    return hash_type, targets
+
+
+# -------------------------
+# Profile files (batch mode)
+# -------------------------
+def _person_from_dict(data, field):
+    if isinstance(data, str):
+        data = {"name": data}
+    if not isinstance(data, dict):
+        raise ValueError(f"{field}: expected an object or a name")
+    return {
+        "name": str(data.get("name", "")).strip(),
+        "birth": parse_date(data.get("birth")),
+        "nickname": str(data.get("nickname") or "").strip()
+    }
+
+
+def profile_from_dict(data):
+    """
+    Build a MasterGuess profile from a JSON object.
+    Returns (profile, options) where options is the optional "options" object
+    (output paths, PIN lengths, leet and other run options).
+
+    Example:
+        {"name": "Marcelo Bregieira", "birth": "12/05/1988",
+         "relationships": [{"name": "Sarah", "birth": "03/07/1990", "nickname": "Sari"}],
+         "children": [], "pets": [{"name": "Rex"}],
+         "important_dates": ["09/09/2012"], "keywords": ["porto"],
+         "emails": ["mbregieira846884@hotmail.com"],
+         "options": {"leet": true, "wordlist": "marcelo.txt",
+                     "pinlist": "marcelo_pins.txt", "pin_lengths": [4, 6]}}
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A profile must be a JSON object")
+    if not str(data.get("name", "")).strip():
+        raise ValueError("A profile needs a non-empty \"name\"")
+
+    emails = []
+    for e in data.get("emails", []):
+        if validate_email(e):
+            emails.append(e)
+        else:
+            print(f"Warning: {e} ignored (invalid email).")
+
+    profile = MasterGuess(
+        name=str(data["name"]).strip(),
+        birth=parse_date(data.get("birth")),
+        relationships=[_person_from_dict(p, "relationships") for p in data.get("relationships", [])],
+        children=[_person_from_dict(p, "children") for p in data.get("children", [])],
+        pets=[_person_from_dict(p, "pets") for p in data.get("pets", [])],
+        important_dates=[d for d in map(parse_date, data.get("important_dates", [])) if d],
+        keywords=[str(k).strip() for k in data.get("keywords", []) if str(k).strip()],
+        emails=emails
+    )
+    options = data.get("options") or {}
+    if not isinstance(options, dict):
+        raise ValueError("\"options\" must be a JSON object")
+    return profile, dict(options)
+
+
+def _iter_json_lines(lines, path, start=1):
+    """JSON Lines: one profile per line, parsed as the lines are read."""
+    for lineno, line in enumerate(lines, start):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({e})")
+
+
+def _iter_json_document(text, path):
+    """One JSON object or list of objects; text that is not valid JSON is read as JSON Lines."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = None
+    if data is not None:
+        yield from (data if isinstance(data, list) else [data])
+    else:
+        yield from _iter_json_lines(text.splitlines(), path)
+
+
+def _iter_profile_stream(stream, path):
+    """
+    Profiles from standard input, as they arrive. A first line holding a
+    complete JSON value means JSON Lines; otherwise the input is one
+    (multi-line) JSON document and is read whole.
+    """
+    lineno = 0
+    for line in stream:
+        lineno += 1
+        if line.strip():
+            break
+    else:
+        return
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        yield from _iter_json_document("\n" * (lineno - 1) + line + stream.read(), path)
+        return
+    yield from (data if isinstance(data, list) else [data])
+    yield from _iter_json_lines(stream, path, lineno + 1)
+
+
+def _iter_profile_objects(path):
+    if path == "-":
+        yield from _iter_profile_stream(sys.stdin, path)
+        return
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            yield from _iter_json_lines(f, path)
+        else:
+            yield from _iter_json_document(f.read(), path)
+
+
+def load_profiles(path):
+    """
+    Yield (profile, options) for every profile in a JSON file (one object or a
+    list of objects) or a JSON Lines file. "-" reads from standard input.
+    Profiles that fail to parse yield (None, error message) so a batch can skip them.
+    """
+    for index, data in enumerate(_iter_profile_objects(path)):
+        try:
+            yield profile_from_dict(data)
+        except ValueError as e:
+            yield None, f"{path} [profile {index}]: {e}"
@@ -0,0 +1,275 @@
+# markov.py
+
+# Character-level Markov scorer for MagicGuess
+#
+# A model is trained once from a plaintext password corpus (one password per
+# line, .gz/.bz2/.xz accepted) and saved as a compact binary table, e.g.
+# rockyou.mgmk:
+#   header (magic, version, byte order, order, alphabet size, trained lines)
+#   followed by log10 P(next symbol | previous `order` symbols) for every
+#   context and symbol, as a packed float32 array.
+# The alphabet is printable ASCII plus one symbol for any other character and
+# start/end markers, so an order-2 table is 98^3 floats (3.6 MB).
+#
+# Candidates are scored in batches: a batch is mapped to symbol indices by one
+# str.translate(), then, with numpy, looked up in one array gather and summed
+# per candidate by one segmented sum; without numpy the same lookups and sums
+# run as chains of C-level map()/accumulate() calls.
+
+import array
+import collections
+import itertools
+import math
+import operator
+import os
+import struct
+import sys
+from pathlib import Path
+
+try:
+    import numpy
+except ImportError:  # optional: pure-Python scoring is used instead
+    numpy = None
+
+from magicguess.io_handlers import COMPRESSIONS
+
+MARKOV_SUFFIX = ".mgmk"
+MARKOV_MAGIC = b"MGMK"
+MARKOV_VERSION = 1
+MARKOV_HEADER = struct.Struct("<4sBcBHQ")
+MARKOV_ORDERS = (1, 2)
+DEFAULT_MARKOV_ORDER = 2
+# added to every n-gram count, so unseen transitions are unlikely but possible
+MARKOV_SMOOTHING = 0.01
+# lines counted at once while training; candidates scored at once while ranking
+MARKOV_TRAIN_CHUNK = 100_000
+MARKOV_SCORE_BATCH = 50_000
+
+ALPHABET = "".join(chr(c) for c in range(32, 127))
+OTHER = len(ALPHABET)
+START = OTHER + 1
+END = OTHER + 2
+SYMBOLS = END + 1
+
+
+class _SymbolMap(dict):
+    """str.translate table: printable ASCII to its index, anything else to OTHER."""
+    def __missing__(self, key):
+        return OTHER
+
+
+_SYMBOL_MAP = _SymbolMap({ord(c): i for i, c in enumerate(ALPHABET)})
+
+
+# markers while a batch is a str: lone surrogates never occur in decoded text
+_START_CHAR = "\ud800"
+_END_CHAR = "\ud801"
+_SYMBOL_MAP[ord(_START_CHAR)] = START
+_SYMBOL_MAP[ord(_END_CHAR)] = END
+
+
+def _encode_batch(words, order):
+    """
+    Symbol indices of several words with their markers, concatenated, and the
+    offset of each word (plus the total length): one translate() for the batch.
+    """
+    prefix = _START_CHAR * order
+    data = "".join([prefix + w + _END_CHAR for w in words]).translate(_SYMBOL_MAP).encode("latin-1")
+    offsets = list(itertools.accumulate((len(w) + order + 1 for w in words), initial=0))
+    return data, offsets
+
+
+def _iter_corpus_lines(path):
+    """Passwords of a (possibly compressed) corpus, decoded as UTF-8."""
+    opener = open
+    for ext, comp_open in COMPRESSIONS.values():
+        if path.name.endswith(ext):
+            opener = comp_open
+    with opener(path, "rb") as fh:
+        for line in fh:
+            line = line.rstrip(b"\r\n")
+            if line:
+                yield line.decode("utf-8", "replace")
+
+
+class MarkovModel:
+    """
+    log10 transition table of an order-`order` character model. score() and
+    score_many() give the log10 likelihood of candidates (0 is certain, lower
+    is less likely); rank() sorts candidates by it, most likely first.
+    """
+    def __init__(self, order, table, trained=0):
+        if order not in MARKOV_ORDERS:
+            raise ValueError(f"Markov order must be one of {', '.join(map(str, MARKOV_ORDERS))}")
+        if len(table) != SYMBOLS ** (order + 1):
+            raise ValueError("Markov table does not match its order")
+        self.order = order
+        self.table = table
+        self.trained = trained
+        self._vector = numpy.frombuffer(table, dtype=numpy.float32) if numpy is not None else None
+        self._nested = None
+
+    # -------------------------
+    # Training and storage
+    # -------------------------
+    @classmethod
+    def train(cls, corpus, order=DEFAULT_MARKOV_ORDER):
+        """
+        Count the n-grams of every password in the corpus file. Lines are joined
+        into chunks with their markers and counted by a C-level Counter; the
+        n-grams spanning two lines end on a start marker and are never looked up.
+        """
+        if order not in MARKOV_ORDERS:
+            raise ValueError(f"Markov order must be one of {', '.join(map(str, MARKOV_ORDERS))}")
+        counts = collections.Counter()
+        trained = 0
+        lines = _iter_corpus_lines(Path(corpus))
+        while True:
+            chunk = list(itertools.islice(lines, MARKOV_TRAIN_CHUNK))
+            if not chunk:
+                break
+            trained += len(chunk)
+            _count_ngrams(counts, _encode_batch(chunk, order)[0], order)
+            if len(chunk) == MARKOV_TRAIN_CHUNK:
+                print(f"  counted {trained:,} passwords...")
+
+        width = order + 1
+        grams = array.array("d", bytes(8 * SYMBOLS ** width))
+        for gram, n in counts.items():
+            index = 0
+            for symbol in gram:
+                index = index * SYMBOLS + symbol
+            grams[index] = n
+
+        table = array.array("f", bytes(4 * len(grams)))
+        log10 = math.log10
+        for ctx in range(0, len(grams), SYMBOLS):
+            row = grams[ctx:ctx + SYMBOLS]
+            total = sum(row) + MARKOV_SMOOTHING * SYMBOLS
+            table[ctx:ctx + SYMBOLS] = array.array("f", (log10((n + MARKOV_SMOOTHING) / total) for n in row))
+        return cls(order, table, trained)
+
+    def save(self, path):
+        """Write the model; a temporary file is renamed, so readers never see a partial one."""
+        path = Path(path)
+        tmp_file = path.with_name(path.name + f".{os.getpid()}.tmp")
+        try:
+            with tmp_file.open("wb") as fh:
+                fh.write(MARKOV_HEADER.pack(MARKOV_MAGIC, MARKOV_VERSION, sys.byteorder[0].encode(),
+                                            self.order, SYMBOLS, self.trained))
+                self.table.tofile(fh)
+            os.replace(tmp_file, path)
+        except OSError:
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        with path.open("rb") as fh:
+            header = fh.read(MARKOV_HEADER.size)
+            if len(header) != MARKOV_HEADER.size:
+                raise ValueError(f"{path.name} is not a MagicGuess Markov model")
+            magic, version, byteorder, order, symbols, trained = MARKOV_HEADER.unpack(header)
+            if magic != MARKOV_MAGIC:
+                raise ValueError(f"{path.name} is not a MagicGuess Markov model")
+            if version != MARKOV_VERSION or symbols != SYMBOLS or order not in MARKOV_ORDERS:
+                raise ValueError(f"{path.name} was written by an incompatible MagicGuess version")
+            table = array.array("f")
+            try:
+                table.fromfile(fh, SYMBOLS ** (order + 1))
+            except EOFError:
+                raise ValueError(f"{path.name} is truncated")
+        if byteorder != sys.byteorder[0].encode():
+            table.byteswap()
+        return cls(order, table, trained)
+
+    # -------------------------
+    # Scoring
+    # -------------------------
+    def score(self, word):
+        """log10 likelihood of one candidate."""
+        return self.score_many([word])[0]
+
+    def score_many(self, words):
+        """log10 likelihoods of a list of candidates, in order."""
+        if not words:
+            return []
+        order = self.order
+        buf, offsets = _encode_batch(words, order)
+        if self._vector is not None:
+            symbols = numpy.frombuffer(buf, dtype=numpy.uint8).astype(numpy.int64)
+            # n-gram ending at every position past the first `order` symbols
+            index = numpy.zeros(len(symbols) - order, dtype=numpy.int64)
+            for k in range(order + 1):
+                index = index * SYMBOLS + symbols[k:len(symbols) - order + k]
+            grams = self._vector[index]
+            # n-grams ending on a start marker straddle two candidates
+            grams[symbols[order:] == START] = 0.0
+            return numpy.add.reduceat(grams.astype(numpy.float64), offsets[:-1]).tolist()
+
+        # rows[a][b][c] is the table entry of n-gram (a, b, c): the lookups and
+        # the running sum are chains of C-level map() calls, with no Python
+        # code per symbol. A candidate's n-grams end `order` symbols before
+        # the next one starts, so its sum is ends[next offset] - totals[offset].
+        grams = map(self._rows().__getitem__, buf)
+        for k in range(1, order + 1):
+            grams = map(operator.getitem, grams, buf[k:])
+        totals = list(itertools.accumulate(grams, initial=0.0))
+        ends = [0.0] * order + totals
+        return list(map(operator.sub, map(ends.__getitem__, offsets[1:]), map(totals.__getitem__, offsets)))
+
+    def _rows(self):
+        """The table as nested lists, one level per symbol (pure-Python scoring)."""
+        if self._nested is None:
+            rows = [self.table[i:i + SYMBOLS].tolist() for i in range(0, len(self.table), SYMBOLS)]
+            for _ in range(self.order - 1):
+                rows = [rows[i:i + SYMBOLS] for i in range(0, len(rows), SYMBOLS)]
+            self._nested = rows
+        return self._nested
+
+    def rank(self, words):
+        """The candidates as a list, most likely first; ties keep their order."""
+        words = list(words)
+        scores = []
+        for i in range(0, len(words), MARKOV_SCORE_BATCH):
+            scores.extend(self.score_many(words[i:i + MARKOV_SCORE_BATCH]))
+        # sorted() stays stable with reverse=True
+        return [words[i] for i in sorted(range(len(words)), key=scores.__getitem__, reverse=True)]
+
+
+def _count_ngrams(counts, data, order):
+    """Add the (order + 1)-grams of a chunk of encoded passwords to `counts`."""
+    counts.update(zip(*(data[k:] for k in range(order + 1))))
+
+
+# loaded models per (path, mtime), shared by every profile of a batch
+_models_cache = {}
+
+
+def load_markov_model(path):
+    """Load a trained model, reusing it when the same file is loaded again."""
+    path = Path(path)
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    model = _models_cache.get(key)
+    if model is None:
+        model = _models_cache[key] = MarkovModel.load(path)
+    return model
+
+
+def train_markov(corpus, output=None, order=DEFAULT_MARKOV_ORDER):
+    """
+    Train a model from a corpus file and save it (default: the corpus path
+    with a .mgmk suffix). Returns the model path.
+    """
+    corpus = Path(corpus)
+    output = Path(output) if output else corpus.with_name(corpus.name + MARKOV_SUFFIX)
+    print(f"[+] Training an order-{order} Markov model from {corpus.name}...")
+    model = MarkovModel.train(corpus, order)
+    model.save(output)
+    print(f"[+] Trained on {model.trained:,} passwords; model saved to {output} "
+          f"({output.stat().st_size:,} bytes)")
+    return output
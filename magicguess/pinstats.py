@@ -0,0 +1,163 @@
+# pinstats.py
+
+# Built-in, frequency-ordered PIN keyspace for MagicGuess
+#
+# Replaces a numeric-order base list (0000, 0001, ...) with the order people
+# actually choose PINs in, generated as a stream without any file:
+#   1. the most common PINs of published leak statistics (COMMON_PINS)
+#   2. structural patterns: repeats, sequences, years, keypad shapes,
+#      repeated/doubled/mirrored digit pairs and calendar dates
+#   3. every remaining PIN, by increasing sum of per-digit likelihood levels
+#      (PIN_DIGIT_LEVELS), so e.g. 1980 comes long before 8636.
+# Each PIN is yielded exactly once; memory is bounded by the patterns of
+# steps 1-2 (a few thousand PINs, plus 10^(n/2) mirrored ones for n digits).
+
+import itertools
+
+# Most frequent PINs per length, most common first.
+COMMON_PINS = {
+    4: ["1234", "1111", "0000", "1212", "7777", "1004", "2000", "4444", "2222", "6969",
+        "9999", "3333", "5555", "6666", "1122", "1313", "8888", "4321", "2001", "1010",
+        "2580", "1985", "1987", "1986", "1984", "1988", "1990", "1989", "2468", "1357",
+        "0852", "1337", "0007", "5683", "0123", "1230", "1369", "0101", "1818", "2112"],
+    6: ["123456", "111111", "000000", "123123", "666666", "121212", "112233", "654321", "123321", "696969",
+        "777777", "159753", "999999", "222222", "101010", "131313", "555555", "888888", "789456", "147258",
+        "123654", "252525", "333333", "444444", "007007", "456789", "112358", "741852", "963852", "147852"],
+}
+
+# Likelihood level of each digit (index) at the first and at the other
+# positions: 0 is the most frequent, higher levels are rarer. Derived from the
+# digit distribution of leaked 4- and 6-digit PINs (years and dates put 1, 0,
+# 2 and 9 ahead).
+PIN_DIGIT_LEVELS = {
+    "first": (1, 0, 1, 3, 3, 2, 3, 2, 3, 2),
+    "other": (0, 0, 1, 2, 2, 2, 2, 2, 2, 1),
+}
+
+# phone keypad strokes (rows, columns, diagonals, the 2-5-8-0 column), both ways
+_KEYPAD_LINES = ["123", "456", "789", "147", "258", "369", "159", "357", "2580"]
+KEYPAD_STROKES = _KEYPAD_LINES + [s[::-1] for s in _KEYPAD_LINES]
+# closed 4-key shapes: corners, the centre cross and 2x2 squares
+KEYPAD_SHAPES = ["1397", "1793", "3971", "7931", "2684", "2486", "4862", "8624",
+                 "1254", "1452", "2365", "2563", "4587", "4785", "5698", "5896"]
+
+# trailing positions precomputed per level sum by iter_level_pins
+_SUFFIX_POSITIONS = 3
+
+
+def _iter_sequences(n):
+    """Ascending and descending runs with wrap-around, steps 1 and 2."""
+    for step in (1, 2):
+        for start in range(10):
+            yield "".join(str((start + i * step) % 10) for i in range(n))
+            yield "".join(str((start - i * step) % 10) for i in range(n))
+
+
+def _iter_keypad_shapes(n):
+    """Keypad shapes, then concatenations of keypad strokes of total length n."""
+    if n == 4:
+        yield from KEYPAD_SHAPES
+    for parts in range(1, n // 3 + 1):
+        for strokes in itertools.product(KEYPAD_STROKES, repeat=parts):
+            if sum(map(len, strokes)) == n:
+                yield "".join(strokes)
+
+
+def _iter_digit_pairs(n):
+    """abab..., aabb... and mirrored (abba, abccba) PINs."""
+    pairs = [f"{a}{b}" for a in range(10) for b in range(10) if a != b]
+    if n % 2 == 0:
+        for p in pairs:
+            yield p * (n // 2)
+        for p in pairs:
+            yield "".join(c * (n // 2) for c in p)
+        for half in itertools.product("0123456789", repeat=n // 2):
+            half = "".join(half)
+            if len(set(half)) > 1:
+                yield half + half[::-1]
+
+
+def _iter_calendar(n):
+    """Years (most common decades first) for 4 digits, then MMDD / DDMM dates."""
+    if n != 4:
+        return
+    for year in itertools.chain(range(1980, 2011), range(1979, 1939, -1), range(2011, 2031)):
+        yield str(year)
+    for month in range(1, 13):
+        for day in range(1, 32):
+            yield f"{month:02d}{day:02d}"
+            yield f"{day:02d}{month:02d}"
+
+
+def iter_pattern_pins(length):
+    """Common PINs and structural patterns of the given length, most likely first, unique."""
+    n = int(length)
+    seen = set()
+    sources = (COMMON_PINS.get(n, ()), (str(d) * n for d in range(10)), _iter_sequences(n),
+               _iter_calendar(n), _iter_keypad_shapes(n), _iter_digit_pairs(n))
+    for pin in itertools.chain.from_iterable(sources):
+        if len(pin) == n and pin.isdigit() and pin not in seen:
+            seen.add(pin)
+            yield pin
+
+
+def _position_levels(n):
+    """Per position: (level, digit) pairs, most likely first."""
+    rows = []
+    for pos in range(n):
+        levels = PIN_DIGIT_LEVELS["first" if pos == 0 else "other"]
+        rows.append(sorted((lvl, str(d)) for d, lvl in enumerate(levels)))
+    return rows
+
+
+def _iter_level_prefixes(prefix, rows, total, bounds):
+    """(prefix, level sum left for the suffix) pairs whose digit levels add up to `total`."""
+    if not rows:
+        yield prefix, total
+        return
+    low, high = bounds[0]
+    for lvl, digit in rows[0]:
+        rest = total - lvl
+        if rest < low:
+            break
+        if rest <= high:
+            yield from _iter_level_prefixes(prefix + digit, rows[1:], rest, bounds[1:])
+
+
+def iter_level_pins(length):
+    """
+    Every PIN of the given length, by increasing sum of digit levels. The last
+    positions are precomputed per level sum (1,000 strings), so the recursion
+    only runs over the prefixes and memory stays constant.
+    """
+    n = int(length)
+    rows = _position_levels(n)
+    k = min(n, _SUFFIX_POSITIONS)
+    prefix_rows, suffix_rows = rows[:n - k], rows[n - k:]
+
+    suffixes = {}
+    for combo in itertools.product(*suffix_rows):
+        suffixes.setdefault(sum(lvl for lvl, _ in combo), []).append("".join(d for _, d in combo))
+
+    # (min, max) level sum of the positions after each prefix position, suffix included;
+    # the prefixes are enumerated recursively, the suffixes appended in C by map()
+    bounds = []
+    for i in range(len(prefix_rows)):
+        tail = prefix_rows[i + 1:]
+        bounds.append((sum(r[0][0] for r in tail) + min(suffixes),
+                       sum(r[-1][0] for r in tail) + max(suffixes)))
+
+    lowest = sum(r[0][0] for r in prefix_rows) + min(suffixes)
+    highest = sum(r[-1][0] for r in prefix_rows) + max(suffixes)
+    for total in range(lowest, highest + 1):
+        for prefix, rest in _iter_level_prefixes("", prefix_rows, total, bounds):
+            yield from map(prefix.__add__, suffixes.get(rest, ()))
+
+
+def iter_frequency_pins(length):
+    """The whole keyspace of the given length in frequency order: patterns, then levels."""
+    patterns = set()
+    for pin in iter_pattern_pins(length):
+        patterns.add(pin)
+        yield pin
+    yield from itertools.filterfalse(patterns.__contains__, iter_level_pins(length))
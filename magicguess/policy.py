@@ -0,0 +1,108 @@
+# policy.py
+
+# Password policies for MagicGuess
+#
+# A policy describes what the target system accepts (length bounds, required
+# character classes, forbidden patterns). The final check runs on every
+# candidate; the optimistic check lets the generator prune words whose
+# expansions can never satisfy the policy before building them.
+
+import re
+
+CHAR_CLASSES = ("lower", "upper", "digit", "special")
+
+_DIGIT = re.compile(r"\d")
+_SPECIAL = re.compile(r"[\W_]")
+
+
+# Tests run on a whole string, so case mapping and regex searches stay in C.
+# Module-level functions keep policies picklable for worker processes.
+def _has_lower(s):
+    return s != s.upper()
+
+
+def _has_upper(s):
+    return s != s.lower()
+
+
+def _has_digit(s):
+    return _DIGIT.search(s) is not None
+
+
+def _has_special(s):
+    return _SPECIAL.search(s) is not None
+
+
+CLASS_TESTS = {"lower": _has_lower, "upper": _has_upper, "digit": _has_digit, "special": _has_special}
+
+
+def char_classes(s):
+    """Set of character classes ("lower", "upper", "digit", "special") present in a string."""
+    return {name for name, test in CLASS_TESTS.items() if test(s)}
+
+
+class PasswordPolicy:
+    """
+    Length bounds, required character classes and forbidden regular expressions.
+
+    Example spec: {"min_length": 10, "max_length": 64,
+                   "require": ["digit", "special"], "forbid": ["^[0-9]", "(.)\\\\1\\\\1"]}
+    """
+    def __init__(self, min_length=None, max_length=None, require=(), forbid=()):
+        self.min_length = int(min_length) if min_length is not None else 0
+        self.max_length = int(max_length) if max_length is not None else None
+        if self.max_length is not None and self.max_length < self.min_length:
+            raise ValueError(f"max_length ({self.max_length}) is below min_length ({self.min_length})")
+
+        require = [require] if isinstance(require, str) else list(require)
+        unknown = [c for c in require if c not in CHAR_CLASSES]
+        if unknown:
+            raise ValueError(f"Unknown character class(es): {', '.join(map(str, unknown))} "
+                             f"(expected {', '.join(CHAR_CLASSES)})")
+        self.require = frozenset(require)
+        self._tests = [CLASS_TESTS[c] for c in CHAR_CLASSES if c in self.require]
+
+        forbid = [forbid] if isinstance(forbid, str) else list(forbid)
+        try:
+            self.forbid = [re.compile(p) for p in forbid]
+        except (re.error, TypeError) as e:
+            raise ValueError(f"Invalid forbidden pattern: {e}")
+
+    @classmethod
+    def from_dict(cls, spec):
+        if not isinstance(spec, dict):
+            raise ValueError("A password policy must be a JSON object")
+        unknown = set(spec) - {"min_length", "max_length", "require", "forbid"}
+        if unknown:
+            raise ValueError(f"Unknown password policy key(s): {', '.join(sorted(unknown))}")
+        return cls(spec.get("min_length"), spec.get("max_length"),
+                   spec.get("require", ()), spec.get("forbid", ()))
+
+    def allows(self, word):
+        """Final check: True if the word itself satisfies the policy."""
+        if len(word) < self.min_length:
+            return False
+        if self.max_length is not None and len(word) > self.max_length:
+            return False
+        for test in self._tests:
+            if not test(word):
+                return False
+        for pattern in self.forbid:
+            if pattern.search(word):
+                return False
+        return True
+
+    def may_allow(self, word, growth=0, classes=frozenset()):
+        """
+        Optimistic check: False only if no expansion of the word that adds at
+        most `growth` characters, drawn from `classes`, and never shortens it
+        can satisfy the policy. Forbidden patterns are not decidable before
+        the word is final, so they are left to allows().
+        """
+        if len(word) + growth < self.min_length:
+            return False
+        if self.max_length is not None and len(word) > self.max_length:
+            return False
+        if self.require and not self.require <= (char_classes(word) | classes):
+            return False
+        return True
@@ -0,0 +1,148 @@
+# scoring.py
+
+# Candidate scoring for MagicGuess
+#
+# A scoring model gives every wordlist candidate an additive score (roughly a
+# log10 likelihood: 0 is the most likely, lower is less likely) from how it
+# was built: the entity its base word comes from, the case and date format of
+# the base word, the common number and special character appended to it and
+# the number of leet substitutions. --top N keeps the N best candidates.
+
+# Sources are the sections of the base word stream (see
+# generators._iter_base_word_sections).
+DEFAULT_WEIGHTS = {
+    "source": {
+        "target": 0.0,
+        "keyword": -0.5,
+        "relation": -1.0,
+        "child": -0.5,
+        "child_combo": -2.0,
+        "pet": -0.5,
+        "pet_combo": -2.0,
+        "target_keyword": -1.5,
+        "target_relation": -2.0,
+        "target_date": 0.0,
+        "relation_date": -1.0,
+        "child_date": -0.5,
+        "pet_date": -0.5,
+        "keyword_date": -0.5,
+    },
+    # case of the letters: lower, Capitalized, UPPER or anything else (camelCase combos)
+    "case": {"lower": 0.0, "capitalized": 0.0, "upper": -1.5, "mixed": -1.0},
+    # digits of the base word, i.e. the date: 1988, 88, 12051988, 120588 / 1251988 ...
+    "date": {"none": -0.5, "year": 0.0, "short_year": -0.5, "full_date": -1.0, "short_date": -1.5},
+    "date_position": {"suffix": 0.0, "prefix": -1.0},
+    # common number appended to the base word ("none" for the plain pass)
+    "number": {"none": 0.0, "1": -0.5, "123": -0.5, "1234": -1.0, "123456": -1.0,
+               "7": -1.0, "69": -1.5, "17": -1.5},
+    # special character placement, plus the character itself
+    "special": {"none": 0.0, "suffix": -0.3, "prefix": -1.5, "both": -2.0},
+    "special_char": {"!": 0.0, "@": -0.3, "#": -0.5, "$": -0.7, "*": -0.7,
+                     "%": -1.0, "&": -1.0, "\"": -1.5},
+    # per substituted letter
+    "leet": -1.0,
+    # multiplier of the Markov log10 likelihood of the candidate (with --markov)
+    "markov": 1.0,
+}
+
+
+def case_feature(word):
+    """"lower", "capitalized", "upper" or "mixed", from the letters of a word."""
+    letters = "".join(c for c in word if c.isalpha())
+    if letters.islower() or not letters:
+        return "lower"
+    if letters.isupper():
+        return "upper" if len(letters) > 1 else "capitalized"
+    if letters[0].isupper() and letters[1:].islower():
+        return "capitalized"
+    return "mixed"
+
+
+def date_feature(word):
+    """
+    (date format, position) of the digits at the end or start of a base word,
+    or ("none", None). Dates are the only digits base words are built with.
+    """
+    end = len(word)
+    while end and word[end - 1].isdigit():
+        end -= 1
+    if end < len(word):
+        digits, position = word[end:], "suffix"
+    else:
+        start = 0
+        while start < len(word) and word[start].isdigit():
+            start += 1
+        if not start:
+            return "none", None
+        digits, position = word[:start], "prefix"
+
+    if len(digits) == 4 and digits[:2] in ("19", "20"):
+        return "year", position
+    if len(digits) == 2:
+        return "short_year", position
+    if len(digits) == 8:
+        return "full_date", position
+    return "short_date", position
+
+
+class ScoringModel:
+    """
+    Additive weights per construction feature; see DEFAULT_WEIGHTS. A partial
+    spec only overrides the weights it names, e.g.
+    {"number": {"123": 0}, "special_char": {"#": 0}, "leet": -2}.
+    """
+    def __init__(self, weights=None):
+        self.weights = {k: (dict(v) if isinstance(v, dict) else v) for k, v in DEFAULT_WEIGHTS.items()}
+        for section, value in (weights or {}).items():
+            default = DEFAULT_WEIGHTS.get(section)
+            if default is None:
+                raise ValueError(f"Unknown scoring section: {section} "
+                                 f"(expected {', '.join(DEFAULT_WEIGHTS)})")
+            if isinstance(default, dict):
+                if not isinstance(value, dict):
+                    raise ValueError(f"Scoring section {section!r} must be a JSON object")
+                for key, weight in value.items():
+                    self.weights[section][key] = self._number(f"{section}.{key}", weight)
+            else:
+                self.weights[section] = self._number(section, value)
+        if self.weights["markov"] < 0:
+            # a Markov likelihood must never raise a score (see generators._iter_top_wordlist)
+            raise ValueError("Scoring weight markov must not be negative")
+
+    @staticmethod
+    def _number(name, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Scoring weight {name} must be a number, got {value!r}")
+        return float(value)
+
+    @classmethod
+    def from_dict(cls, spec):
+        if not isinstance(spec, dict):
+            raise ValueError("A scoring model must be a JSON object")
+        return cls(spec)
+
+    @property
+    def leet(self):
+        return self.weights["leet"]
+
+    @property
+    def markov(self):
+        return self.weights["markov"]
+
+    def base_score(self, source, word):
+        """Score of a base word from the given source section."""
+        w = self.weights
+        date, position = date_feature(word)
+        score = w["source"].get(source, 0.0) + w["case"][case_feature(word)] + w["date"][date]
+        if position is not None:
+            score += w["date_position"][position]
+        return score
+
+    def number_score(self, number):
+        return self.weights["number"].get(number or "none", 0.0)
+
+    def special_score(self, placement, char=None):
+        score = self.weights["special"][placement]
+        if char is not None:
+            score += self.weights["special_char"].get(char, 0.0)
+        return score
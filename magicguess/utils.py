@@ -1,11 +1,84 @@
 # utils.py
 
+import bisect
+import functools
+import hashlib
+import mmap
 import os
 import platform
 import unicodedata
 from datetime import datetime
 import re
 
+# -------------------------
+# Variant cache
+# -------------------------
+# Names, nicknames, surnames and dates recur across the entities of a profile
+# and across the profiles of a batch, so their expansions are memoized.
+VARIANT_CACHE_SIZE = 65536
+_VARIANT_CACHES = {}
+
+def variant_cache(maxsize=VARIANT_CACHE_SIZE):
+    """
+    Memoize a variant function in a bounded LRU cache shared by every entity
+    and profile of the process. List results are stored as tuples and handed
+    out as fresh lists, so callers may extend them freely.
+    """
+    def decorate(func):
+        @functools.lru_cache(maxsize=maxsize)
+        def frozen(*args):
+            result = func(*args)
+            return tuple(result) if isinstance(result, list) else result
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            result = frozen(*args)
+            return list(result) if isinstance(result, tuple) else result
+
+        wrapper.cache_info = frozen.cache_info
+        wrapper.cache_clear = frozen.cache_clear
+        _VARIANT_CACHES[func.__name__] = frozen
+        return wrapper
+    return decorate
+
+def variant_cache_stats():
+    """
+    Returns {function name: {"hits", "misses", "size", "maxsize"}} for every variant cache.
+    """
+    stats = {}
+    for name, cached in _VARIANT_CACHES.items():
+        info = cached.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+    return stats
+
+def clear_variant_caches():
+    for cached in _VARIANT_CACHES.values():
+        cached.cache_clear()
+
+# -------------------------
+# Sorted 64-bit word keys
+# -------------------------
+# Shared by the exclusion index and the disk deduplicator: words are reduced
+# to 64-bit keys, stored sorted in files, memory-mapped and bisected.
+
+def word_key(data):
+    """64-bit key of a word (bytes). Collisions are negligible below billions of words."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def map_keys(path, offset=0):
+    """
+    Memory-map a file of sorted 64-bit keys, starting `offset` bytes in.
+    Returns the keys as a memoryview; its .obj is the mmap to close.
+    """
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm)[offset:].cast("Q")
+
+def has_key(keys, key):
+    """Whether `key` is in the sorted sequence `keys`, by bisection."""
+    i = bisect.bisect_left(keys, key)
+    return i < len(keys) and keys[i] == key
+
 def clear_screen():
     """
     Clear the console screen.
@@ -28,6 +101,17 @@ def dedupe(items):
             seen.add(i)
     return clean
 
+def iter_unique(items):
+    """
+    Lazily yield items from any iterable, skipping duplicates and preserving order.
+    Only the set of already-seen items is kept in memory.
+    """
+    seen = set()
+    for i in items:
+        if i not in seen:
+            seen.add(i)
+            yield i
+
 # Validate if the guess is minimum length, if not, discard
 def validate_min_length(list, min_length):
     """
@@ -53,7 +137,21 @@ def validate_date(date_str):
     except ValueError:
         return False
 
+# Parse a DD/MM/YYYY string into a date
+def parse_date(date_str):
+    """
+    Parse a date in DD/MM/YYYY format.
+    Returns a date object, None for an empty value, or raises ValueError.
+    """
+    if date_str is None or str(date_str).strip() == "":
+        return None
+    date_str = str(date_str).strip()
+    if not validate_date(date_str):
+        raise ValueError(f"Invalid date {date_str!r}. Expected DD/MM/YYYY.")
+    return datetime.strptime(date_str, "%d/%m/%Y").date()
+
 # Remove spaces, accents, and non-alphanumeric characters
+@variant_cache()
 def sanitize_word(word):
     """
     Sanitize a word by removing spaces, accents, and non-alphanumeric characters.
@@ -119,7 +217,11 @@ def all_upper(word: str) -> bool:
     True if all alphabetic characters are uppercase.
     Ignores numbers and special characters.
     """
-    letters = [c for c in word if c.isalpha()]
-    if not letters:  # if there are no letters, it is not considered "all upper"
-        return False
-    return all(c.isupper() for c in letters)
+    has_letters = False
+    for c in word:
+        if c.isalpha():
+            if not c.isupper():  # stop at the first lowercase letter
+                return False
+            has_letters = True
+    # if there are no letters, it is not considered "all upper"
+    return has_letters
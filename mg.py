@@ -1,8 +1,15 @@
 import argparse
-from magicguess.cli import main_cli
+from magicguess.cli import main_cli, run_batch
 from magicguess.banner import get_banner, get_alternate_banner, get_alternate_banner_2, get_alternate_banner_3
 from magicguess.utils import clear_screen
+from magicguess.dedup import DEDUP_MODES
+from magicguess.crack import HASH_TYPES
+from magicguess.io_handlers import COMPRESSIONS, SHARD_MODES, STDOUT, open_output_stream
+from magicguess.markov import MARKOV_ORDERS, DEFAULT_MARKOV_ORDER, train_markov
+import contextlib
+import os
 import random
+import sys
 
 def print_help():
     """
@@ -16,6 +23,51 @@ Usage:
     mg                   Launch with banner and interactive menu
     mg -q                Quiet mode (no banner)
     mg -h / --help       Show help message
+    mg --batch FILE...   Process JSON / JSON Lines profiles without prompts
+    mg --stdout FILE...  Stream candidates of JSON profiles to standard output,
+                         e.g. mg --stdout profile.json | hashcat -m 1000 hashes.txt
+    mg --train-markov CORPUS [--markov FILE]
+                         Train a character Markov model from a password list
+                         (saved to FILE, default CORPUS.mgmk)
+
+Options:
+    --dedup MODE         Deduplication backend: memory (default), disk, bloom
+    --fp-rate RATE       False-positive rate for --dedup bloom (default 0.001)
+    --dedup-capacity N   Expected unique candidates for --dedup bloom/disk (default 10000000)
+    --dedup-partitions N Temp file partitions for --dedup disk (default: from --dedup-capacity)
+    --workers N          Expand candidates in N processes (0 = all cores, default 1)
+    --compress FORMAT    Compress output files on the fly: gz, bz2, xz
+    --shards N           Split each output file into N shards plus a JSON manifest
+                         (lines, bytes and SHA-256 per shard)
+    --shard-mode MODE    How lines are dealt to shards: round-robin (default), balanced
+    --hashcat-rules      Write base words plus a hashcat .rule file instead of
+                         the fully expanded wordlist
+    --estimate           Print the size of each generation stage and exit
+    --write-base-file    Write a missing PIN<n>_markov.txt base file (for hashcat)
+    --report FILE        Write per-stage timings, item counts and memory as JSON
+    --leet-depth K       Substitute up to K letters at once in leet variants (default 1)
+    --leet-map FILE      JSON leet map, e.g. {"a": ["4", "@"], "t": "7"}
+    --leet-word-budget N At most N leet variants per candidate
+    --leet-budget N      At most N leet candidates in the whole wordlist
+    --policy FILE        JSON password policy; candidates that cannot satisfy it
+                         are pruned during generation, e.g.
+                         {"min_length": 10, "require": ["digit", "special"]}
+    --top N              Keep only the N most likely candidates, best first
+    --score-model FILE   JSON weights for --top scoring (entity, case, date format,
+                         number, special character, leet)
+    --markov FILE        Rank the wordlist and the base PIN list by the likelihood of a
+                         trained Markov model (added to the score with --top)
+    --markov-order K     Context length of --train-markov: 1 or 2 (default 2)
+    --exclude FILE       Drop candidates found in an already-tried wordlist
+                         (indexed once into FILE.mgex; repeat for several)
+    --skip N             Start the wordlist at raw keyspace index N (resume / distribute)
+    --limit M            Generate at most M raw keyspace indices
+    --crack FILE         Test candidates against the hashes in FILE in-process
+                         (no wordlist is written) and report the hits
+    --hash-type TYPE     md5, sha1, sha256 or ntlm (default: inferred from length)
+    --stdout             Write candidates to standard output as they are generated
+                         (progress messages go to standard error)
+    --fifo PATH          Write candidates to a named pipe (created if missing)
 
 Description:
     MagicGuess is an wordlist and PIN generator based on real-world
@@ -36,21 +88,94 @@ def main():
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("-q", action="store_true", help="Quiet mode (no banner)")
     parser.add_argument("-h", "--help", "--h", action="store_true")
+    parser.add_argument("--dedup", choices=DEDUP_MODES)
+    parser.add_argument("--fp-rate", type=float)
+    parser.add_argument("--dedup-capacity", type=int)
+    parser.add_argument("--dedup-partitions", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--compress", choices=list(COMPRESSIONS))
+    parser.add_argument("--shards", type=int)
+    parser.add_argument("--shard-mode", choices=SHARD_MODES)
+    parser.add_argument("--hashcat-rules", action="store_true")
+    parser.add_argument("--estimate", action="store_true")
+    parser.add_argument("--write-base-file", action="store_true")
+    parser.add_argument("--report", metavar="FILE")
+    parser.add_argument("--leet-depth", type=int)
+    parser.add_argument("--leet-map", metavar="FILE")
+    parser.add_argument("--leet-word-budget", type=int)
+    parser.add_argument("--leet-budget", type=int)
+    parser.add_argument("--policy", metavar="FILE")
+    parser.add_argument("--top", type=int)
+    parser.add_argument("--score-model", metavar="FILE")
+    parser.add_argument("--markov", metavar="FILE")
+    parser.add_argument("--train-markov", metavar="CORPUS")
+    parser.add_argument("--markov-order", type=int, choices=MARKOV_ORDERS, default=DEFAULT_MARKOV_ORDER)
+    parser.add_argument("--exclude", action="append", metavar="FILE")
+    parser.add_argument("--skip", type=int)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--crack", metavar="FILE")
+    parser.add_argument("--hash-type", choices=HASH_TYPES)
+    parser.add_argument("--stdout", action="store_true")
+    parser.add_argument("--fifo", metavar="PATH")
+    parser.add_argument("--batch", nargs="+", metavar="FILE")
+    parser.add_argument("profiles", nargs="*", metavar="FILE")
     args = parser.parse_args()
-    
-    clear_screen()
 
     if args.help:
         print_help()
         return
 
+    if args.train_markov:
+        try:
+            train_markov(args.train_markov, args.markov, args.markov_order)
+        except (ValueError, OSError) as e:
+            print(f"[!] Markov training failed: {e}")
+            raise SystemExit(1)
+        return
+
+    # profiles given without --batch are processed the same way
+    args.batch = (args.batch or []) + args.profiles
+
+    stream_target = STDOUT if args.stdout else args.fifo
+    if not stream_target:
+        run(args)
+        return
+
+    # candidates go to the stream; everything else is progress output
+    try:
+        with open_output_stream(stream_target) as stream, contextlib.redirect_stdout(sys.stderr):
+            args.output_stream = stream
+            args.q = True
+            run(args)
+    except BrokenPipeError:
+        pass
+    except (ValueError, OSError) as e:
+        print(f"[!] Streaming to {stream_target} failed: {e}", file=sys.stderr)
+        raise SystemExit(1)
+    finally:
+        if args.stdout:
+            # the reader may be gone: keep the interpreter from flushing into a closed pipe
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+
+
+def run(args):
+    if args.batch:
+        # unattended: no screen clearing, banner or prompts
+        ok = run_batch(args.batch, args)
+        raise SystemExit(0 if ok else 1)
+
+    if getattr(args, "output_stream", None) is None:
+        # clearing writes to the terminal's stdout, which is the candidate stream otherwise
+        clear_screen()
+
     if not args.q:
         # Randomly select a banner to display
         banners = [get_banner(), get_alternate_banner(), get_alternate_banner_2(), get_alternate_banner_3()]
         banner = random.choice(banners)
         print(banner)
 
-    main_cli()
+    main_cli(args)
 
 
 if __name__ == "__main__":